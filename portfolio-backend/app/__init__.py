@@ -20,11 +20,22 @@ def create_app(config_class=Config):
     from app.binary_tree.routes import binary_tree_bp
     from app.binary_search_tree.routes import bst_bp
     from app.bfs.routes import bfs_bp
+    from app.priority_queue.routes import priority_queue_bp
+    from app.sorting_algorithms.routes import sorting_bp
 
     app.register_blueprint(main, url_prefix='/api')
     app.register_blueprint(binary_tree_bp, url_prefix='/api/binary-tree')
     app.register_blueprint(bst_bp, url_prefix='/api/binary-search-tree')
     app.register_blueprint(bfs_bp, url_prefix='/api/bfs')
+    app.register_blueprint(priority_queue_bp, url_prefix='/api/priority-queue')
+    app.register_blueprint(sorting_bp, url_prefix='/api/sorting-algorithms')
+
+    from app.bfs.history import init_history_writer
+    init_history_writer(app)
+
+    if app.config.get('QUEUE_WRITE_BEHIND'):
+        from app.write_behind import init_write_behind
+        init_write_behind(app)
 
     # CORS configuration - Read from environment variable
     cors_origins = os.environ.get('CORS_ORIGINS', 'http://localhost:5173,http://localhost:8080').split(',')
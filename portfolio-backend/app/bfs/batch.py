@@ -0,0 +1,136 @@
+"""
+Many-pair route search for /api/bfs/search-many.
+
+Pairs are grouped by origin so each origin is searched once: hop routes
+are read from the precomputed route table (or one BFS tree per origin on
+networks too large for a table), and distance routes come from one full
+Dijkstra tree per origin that answers all of its destinations.
+With BFS_SEARCH_PROCESSES > 1, distance-mode batches with enough distinct
+origins spread those trees across a process pool that holds its own copy
+of the compiled graph.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import threading
+
+from app.bfs.utils import bfs_tree, dijkstra_tree, path_distance, reconstruct_path
+
+MAX_SEARCH_PAIRS = 10000
+# Below this many distinct origins the pool's overhead outweighs the work
+PARALLEL_MIN_ORIGINS = 8
+
+
+def group_by_origin(pairs):
+    """{origin: [destination, ...]} in first-seen order"""
+    groups = {}
+    for start, end in pairs:
+        groups.setdefault(start, []).append(end)
+    return groups
+
+
+def hop_routes(network, origin, destinations):
+    table = network.route_table
+    if table is None:
+        return tree_hop_routes(network.graph, origin, destinations)
+    routes = {}
+    for end in destinations:
+        path = table.path(origin, end)
+        routes[end] = (path, path_distance(network.graph, path)) if path else None
+    return routes
+
+
+def tree_hop_routes(graph, origin, destinations):
+    source = graph.index.get(origin)
+    if source is None:
+        return {end: None for end in destinations}
+    parent = bfs_tree(graph, source)
+    routes = {}
+    for end in destinations:
+        target = graph.index.get(end)
+        if target is None or parent[target] == -1:
+            routes[end] = None
+        else:
+            path = graph.to_names(reconstruct_path(parent, source, target))
+            routes[end] = (path, path_distance(graph, path))
+    return routes
+
+
+def distance_routes(graph, origin, destinations):
+    source = graph.index.get(origin)
+    if source is None:
+        return {end: None for end in destinations}
+    dist, parent = dijkstra_tree(graph, source)
+    routes = {}
+    for end in destinations:
+        target = graph.index.get(end)
+        if target is None or parent[target] == -1:
+            routes[end] = None
+        else:
+            routes[end] = (graph.to_names(reconstruct_path(parent, source, target)), dist[target])
+    return routes
+
+
+# Process pool, rebuilt whenever the live network changes
+
+_pool = None
+_pool_digest = None
+_pool_lock = threading.Lock()
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _distance_routes_in_worker(origin, destinations):
+    return distance_routes(_worker_graph, origin, destinations)
+
+
+def get_pool(network, processes):
+    global _pool, _pool_digest
+    with _pool_lock:
+        if _pool is None or _pool_digest != network.digest:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            # spawn rather than fork: request threads may be holding locks
+            _pool = ProcessPoolExecutor(
+                processes, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker, initargs=(network.graph,)
+            )
+            _pool_digest = network.digest
+        return _pool
+
+
+def _parallel_distance_routes(network, groups, processes):
+    """Distance routes per origin computed in the pool, or None if the pool broke"""
+    global _pool
+    origins = list(groups)
+    pool = get_pool(network, processes)
+    try:
+        results = pool.map(_distance_routes_in_worker, origins, [groups[o] for o in origins],
+                           chunksize=max(1, len(origins) // (processes * 4)))
+        return dict(zip(origins, results))
+    except BrokenProcessPool:
+        logging.getLogger(__name__).warning('Route search pool failed; searching in-process', exc_info=True)
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        return None
+
+
+def search_many(network, pairs, mode, processes=0):
+    """Return [(path, distance_km) or None] aligned with pairs"""
+    groups = group_by_origin(pairs)
+    
+    by_origin = None
+    if mode == 'hops':
+        by_origin = {origin: hop_routes(network, origin, ends) for origin, ends in groups.items()}
+    elif processes > 1 and len(groups) >= PARALLEL_MIN_ORIGINS:
+        by_origin = _parallel_distance_routes(network, groups, processes)
+    if by_origin is None:
+        by_origin = {origin: distance_routes(network.graph, origin, ends) for origin, ends in groups.items()}
+    
+    return [by_origin[start][end] for start, end in pairs]
@@ -0,0 +1,104 @@
+from array import array
+
+
+class CompiledGraph:
+    """
+    Undirected station graph with station names interned to integer IDs and
+    adjacency stored in CSR (compressed sparse row) arrays:
+
+        neighbors[offsets[i]:offsets[i + 1]]  stations adjacent to station i
+        distances[offsets[i]:offsets[i + 1]]  distance_km of those segments
+
+    Per edge this costs 4 bytes plus 8 for the distance, instead of a Python
+    tuple holding a name and a float, and traversals compare ints instead of
+    hashing names. Station IDs follow first appearance in the segment list
+    and neighbors keep segment order, matching build_graph's dict exactly.
+    """
+
+    def __init__(self, names, offsets, neighbors, distances):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.distances = distances
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Build from (from_station, to_station, distance_km) triples"""
+        index = {}
+        names = []
+        sources = array('i')
+        targets = array('i')
+        lengths = array('d')
+
+        for from_station, to_station, distance in segments:
+            for name in (from_station, to_station):
+                if name not in index:
+                    index[name] = len(names)
+                    names.append(name)
+            sources.append(index[from_station])
+            targets.append(index[to_station])
+            lengths.append(distance)
+
+        size = len(names)
+        degree = array('i', [0]) * (size + 1)
+        for u, v in zip(sources, targets):
+            degree[u] += 1
+            degree[v] += 1
+
+        offsets = array('i', [0]) * (size + 1)
+        for i in range(size):
+            offsets[i + 1] = offsets[i] + degree[i]
+
+        fill = array('i', offsets[:size])
+        neighbors = array('i', [0]) * offsets[size]
+        distances = array('d', [0.0]) * offsets[size]
+        for u, v, distance in zip(sources, targets, lengths):
+            neighbors[fill[u]] = v
+            distances[fill[u]] = distance
+            fill[u] += 1
+            neighbors[fill[v]] = u
+            distances[fill[v]] = distance
+            fill[v] += 1
+
+        return cls(names, offsets, neighbors, distances)
+
+    @classmethod
+    def from_adjacency(cls, graph):
+        """Build from a build_graph-style dict of name -> [(neighbor, distance), ...]"""
+        names = list(graph)
+        index = {name: i for i, name in enumerate(names)}
+        offsets = array('i', [0])
+        neighbors = array('i')
+        distances = array('d')
+        for name in names:
+            for neighbor, distance in graph[name]:
+                neighbors.append(index[neighbor])
+                distances.append(distance)
+            offsets.append(len(neighbors))
+        return cls(names, offsets, neighbors, distances)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def adjacent(self, station_id):
+        """IDs of the stations next to station_id, in segment order"""
+        return self.neighbors[self.offsets[station_id]:self.offsets[station_id + 1]]
+
+    def edges(self, station_id):
+        """(neighbor ID, distance_km) pairs for station_id"""
+        start, end = self.offsets[station_id], self.offsets[station_id + 1]
+        return zip(self.neighbors[start:end], self.distances[start:end])
+
+    def to_names(self, station_ids):
+        return [self.names[i] for i in station_ids]
+
+
+def as_compiled(graph):
+    """Accept either a CompiledGraph or a build_graph dict (compiled on the fly)"""
+    if isinstance(graph, CompiledGraph):
+        return graph
+    return CompiledGraph.from_adjacency(graph)
@@ -0,0 +1,154 @@
+"""
+Background writer for BFS search history.
+
+search_path records each search with HistoryWriter.record(), which only
+appends to a bounded in-memory buffer. A daemon thread inserts the buffer
+into bfs_operation in batches every BFS_HISTORY_FLUSH_INTERVAL_MS, or as
+soon as BFS_HISTORY_BATCH_SIZE rows are waiting, so route queries never
+wait on a database write. When more than BFS_HISTORY_MAX_PENDING rows are
+waiting (the database is slow or down) new rows evict the oldest ones, or
+are themselves dropped with BFS_HISTORY_DROP_POLICY = 'newest'; history
+is best-effort.
+
+The same thread prunes rows older than BFS_HISTORY_RETENTION_DAYS every
+BFS_HISTORY_PRUNE_INTERVAL_SECONDS.
+"""
+from collections import deque
+from datetime import datetime, timedelta
+import atexit
+import threading
+import time
+
+from flask import current_app
+from app import db
+from app.bfs.models import BFSOperation
+
+DROP_POLICIES = ('oldest', 'newest')
+
+
+class HistoryWriter:
+    def __init__(self, app, interval_ms, batch_size, max_pending, drop_policy,
+                 retention_days, prune_interval_seconds):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"BFS_HISTORY_DROP_POLICY must be one of: {', '.join(DROP_POLICIES)}")
+        self.app = app
+        self.interval = interval_ms / 1000
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.drop_policy = drop_policy
+        self.retention_days = retention_days
+        self.prune_interval = prune_interval_seconds
+        self.pending = deque()
+        self.lock = threading.Lock()        # guards pending and starting the thread
+        self.flush_lock = threading.Lock()  # keeps batches in order
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.last_prune = None
+        self.stats = {'recorded': 0, 'written': 0, 'dropped': 0, 'write_errors': 0,
+                      'pruned': 0, 'last_flush_ms': None}
+
+    def record(self, **fields):
+        """Queue one bfs_operation row; returns False if it was dropped"""
+        fields.setdefault('created_at', datetime.utcnow())
+        with self.lock:
+            self._start()
+            if len(self.pending) >= self.max_pending:
+                self.stats['dropped'] += 1
+                if self.drop_policy == 'newest':
+                    return False
+                self.pending.popleft()
+            self.pending.append(fields)
+            self.stats['recorded'] += 1
+            if len(self.pending) >= self.batch_size:
+                self.wakeup.set()
+        return True
+
+    def flush(self):
+        """Insert everything recorded so far"""
+        with self.flush_lock:
+            with self.lock:
+                rows = list(self.pending)
+                self.pending.clear()
+            if not rows:
+                return
+            start = time.perf_counter()
+            with self.app.app_context():
+                for i in range(0, len(rows), self.batch_size):
+                    batch = rows[i:i + self.batch_size]
+                    try:
+                        db.session.execute(db.insert(BFSOperation), batch)
+                        db.session.commit()
+                        self.stats['written'] += len(batch)
+                    except Exception:
+                        db.session.rollback()
+                        self.app.logger.exception('Could not write %d BFS history rows', len(batch))
+                        self.stats['write_errors'] += 1
+                        self.stats['dropped'] += len(batch)
+                db.session.remove()
+            self.stats['last_flush_ms'] = (time.perf_counter() - start) * 1000
+
+    def prune(self):
+        """Delete rows older than the retention period; returns how many"""
+        if not self.retention_days:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        with self.app.app_context():
+            try:
+                deleted = BFSOperation.query.filter(BFSOperation.created_at < cutoff).delete(
+                    synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception('Could not prune BFS history')
+                deleted = 0
+            db.session.remove()
+        self.stats['pruned'] += deleted
+        return deleted
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+            now = time.monotonic()
+            if self.last_prune is None or now - self.last_prune >= self.prune_interval:
+                self.last_prune = now
+                self.prune()
+
+    def _start(self):
+        # Started on first use so CLI commands (e.g. flask db upgrade) never spawn it
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name='bfs-history-writer', daemon=True)
+            self.thread.start()
+            atexit.register(self.flush)
+
+    def metrics(self):
+        with self.lock:
+            pending = len(self.pending)
+        return {
+            'pending': pending,
+            'max_pending': self.max_pending,
+            'drop_policy': self.drop_policy,
+            'flush_interval_ms': self.interval * 1000,
+            'batch_size': self.batch_size,
+            'retention_days': self.retention_days,
+            **self.stats
+        }
+
+
+def get_history_writer():
+    return current_app.extensions['bfs_history']
+
+
+def init_history_writer(app):
+    writer = HistoryWriter(
+        app,
+        app.config['BFS_HISTORY_FLUSH_INTERVAL_MS'],
+        app.config['BFS_HISTORY_BATCH_SIZE'],
+        app.config['BFS_HISTORY_MAX_PENDING'],
+        app.config['BFS_HISTORY_DROP_POLICY'],
+        app.config['BFS_HISTORY_RETENTION_DAYS'],
+        app.config['BFS_HISTORY_PRUNE_INTERVAL_SECONDS']
+    )
+    app.extensions['bfs_history'] = writer
+    return writer
@@ -0,0 +1,62 @@
+import math
+
+from app.bfs.utils import dijkstra_distances
+
+DEFAULT_LANDMARKS = 4
+
+
+class Landmarks:
+    """
+    ALT (A*, landmarks, triangle inequality) heuristic for distance searches.
+
+    For every landmark L the distance_km from L to every station is
+    precomputed once. Since the graph is undirected, |d(L, t) - d(L, v)| is
+    a lower bound on d(v, t) for any L, so the largest of these bounds is an
+    admissible and consistent A* heuristic towards target t.
+    """
+
+    def __init__(self, landmarks, tables):
+        self.landmarks = landmarks
+        self.tables = tables
+
+    @classmethod
+    def select(cls, graph, count=DEFAULT_LANDMARKS):
+        """Pick landmarks by farthest-point selection, which spreads them around the network's edge"""
+        if not len(graph):
+            return cls([], [])
+        
+        landmarks, tables = [], []
+        # Start from the station farthest from an arbitrary one, then keep
+        # adding whichever station is farthest from all landmarks so far
+        closest = dijkstra_distances(graph, 0)
+        for _ in range(min(count, len(graph))):
+            candidate = max(
+                (i for i in range(len(graph)) if i not in landmarks and math.isfinite(closest[i])),
+                key=closest.__getitem__, default=None
+            )
+            if candidate is None:
+                break
+            table = dijkstra_distances(graph, candidate)
+            landmarks.append(candidate)
+            tables.append(table)
+            closest = table if len(landmarks) == 1 else [min(a, b) for a, b in zip(closest, table)]
+        
+        return cls(landmarks, tables)
+
+    def heuristic(self, target):
+        """Return h(station) = lower bound on the distance_km from station to target"""
+        towards = [(table, table[target]) for table in self.tables if math.isfinite(table[target])]
+        
+        def estimate(station):
+            best = 0.0
+            for table, to_target in towards:
+                from_station = table[station]
+                if math.isinf(from_station):
+                    # The landmark reaches target but not station: no route at all
+                    return math.inf
+                bound = abs(to_target - from_station)
+                if bound > best:
+                    best = bound
+            return best
+        
+        return estimate
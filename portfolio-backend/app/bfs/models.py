@@ -9,7 +9,7 @@ class BFSOperation(db.Model):
     end_station = db.Column(db.String(100))
     path = db.Column(db.JSON)
     segments = db.Column(db.JSON)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
     def to_dict(self):
         return {
@@ -26,13 +26,15 @@ class TrainGraph(db.Model):
     __tablename__ = 'train_graph'
     
     id = db.Column(db.Integer, primary_key=True)
-    graph_data = db.Column(db.JSON)  # Adjacency list representation
+    version = db.Column(db.Integer, nullable=False, unique=True, index=True)  # Highest version is live
+    graph_data = db.Column(db.JSON)  # Lines and segments, same shape as stations_data.json
     stations_list = db.Column(db.JSON)  # All station names
     updated_at = db.Column(db.DateTime, default=db.func.now(), onupdate=db.func.now())
     
     def to_dict(self):
         return {
             'id': self.id,
+            'version': self.version,
             'graph_data': self.graph_data,
             'stations_list': self.stations_list,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
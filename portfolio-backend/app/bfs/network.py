@@ -0,0 +1,190 @@
+"""
+Process-wide cache of everything derived from the station network.
+
+A StationNetwork is an immutable snapshot: the parsed data, the compiled
+graph, the per-line station lists and the serialized /stations response,
+with the route table and landmarks built lazily on first use.
+
+The live network is the highest version in the train_graph table, falling
+back to stations_data.json until a network has been uploaded. get_network()
+checks for a newer version (or a changed file mtime) at most once per
+CHECK_INTERVAL_SECONDS and replaces the snapshot wholesale, so every worker
+picks up an upload without a restart and no request ever sees a
+half-updated mix of old and new data.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.bfs.landmarks import Landmarks
+from app.bfs.models import TrainGraph
+from app.bfs.route_table import RouteTable
+from app.bfs.utils import stations_data_path, compile_graph, bfs_shortest_path
+
+# How often each worker looks for a new graph version or stations_data.json mtime
+CHECK_INTERVAL_SECONDS = 1.0
+# The route table takes 4 * V^2 bytes (16 MiB at this size) and O(V * E) time to
+# build; bigger networks search live instead
+ROUTE_TABLE_MAX_STATIONS = 2048
+
+# Lines listed first, in this order, when a network has them (the Manila network
+# the frontend was built for); any other lines follow in upload order
+LINES = ('lrt1', 'lrt2', 'mrt3', 'transfers')
+TRANSFER_LINE = 'transfers'
+
+
+def stations_by_line(stations_data):
+    """Return the sorted stations of every line in the network, known lines first"""
+    result = {line: [] for line in LINES}
+    for line_name, line_data in stations_data.items():
+        stations_set = set()
+        for segment in line_data.get('segments', []):
+            stations_set.add(segment['from'])
+            stations_set.add(segment['to'])
+        result[line_name] = sorted(stations_set)
+    return result
+
+
+def all_stations(by_line):
+    """Every station once, by line, with stations only reachable through transfers last"""
+    lines = [line for line in by_line if line != TRANSFER_LINE] + [TRANSFER_LINE]
+    return list(dict.fromkeys(station for line in lines for station in by_line.get(line, ())))
+
+
+class StationNetwork:
+    def __init__(self, stations_data, instance_path, version=None, mtime_ns=None):
+        self.stations_data = stations_data
+        self.instance_path = instance_path
+        self.version = version  # train_graph version, or None when read from the file
+        self.mtime_ns = mtime_ns
+        self.digest = hashlib.sha1(json.dumps(stations_data, sort_keys=True).encode('utf-8')).hexdigest()
+        self.graph = compile_graph(stations_data)
+        self.by_line = stations_by_line(stations_data)
+
+        # Flatten into single array but preserve line order
+        self.stations_body = json.dumps(
+            {'stations': all_stations(self.by_line), 'by_line': self.by_line}, separators=(',', ':')
+        ).encode('utf-8')
+        self.stations_etag = hashlib.sha1(self.stations_body).hexdigest()
+
+        self._lock = threading.Lock()
+        self._route_table = None
+        self._landmarks = None
+
+    @classmethod
+    def from_file(cls, path, instance_path):
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), instance_path, mtime_ns=mtime_ns)
+
+    @classmethod
+    def from_row(cls, row, instance_path):
+        return cls(row.graph_data, instance_path, version=row.version)
+
+    @property
+    def route_table(self):
+        """
+        All-pairs route table for this graph, or None if the network is too
+        large for one. The first worker to need it builds it and saves it
+        under instance/, keyed by a hash of the stations data; other workers
+        memory-map that file instead of rebuilding.
+        """
+        if len(self.graph) > ROUTE_TABLE_MAX_STATIONS:
+            return None
+        with self._lock:
+            if self._route_table is None:
+                self._route_table = self._load_route_table()
+            return self._route_table
+
+    def _load_route_table(self):
+        path = os.path.join(self.instance_path, f'route_table-{self.digest[:16]}.bin')
+        if os.path.exists(path):
+            return RouteTable.load(path)
+        table = RouteTable.build(self.graph)
+        try:
+            os.makedirs(self.instance_path, exist_ok=True)
+            table.save(path)
+        except OSError:
+            logging.getLogger(__name__).warning('Could not save route table to %s', path)
+        return table
+
+    def hop_path(self, start, end):
+        """Fewest-hops route, from the route table when there is one"""
+        table = self.route_table
+        if table is None:
+            return bfs_shortest_path(self.graph, start, end)
+        return table.path(start, end)
+
+    @property
+    def landmarks(self):
+        """ALT landmark distance tables for distance-mode searches"""
+        with self._lock:
+            if self._landmarks is None:
+                self._landmarks = Landmarks.select(self.graph)
+            return self._landmarks
+
+
+_network = None
+_checked_at = 0.0
+_reload_lock = threading.Lock()
+_version_error_logged = False
+
+
+def latest_version():
+    """Highest train_graph version, or None if no network has been uploaded"""
+    global _version_error_logged
+    try:
+        return db.session.query(db.func.max(TrainGraph.version)).scalar()
+    except SQLAlchemyError:
+        # e.g. migrations not applied yet: keep serving the file
+        db.session.rollback()
+        if not _version_error_logged:
+            current_app.logger.warning('Could not read train_graph version', exc_info=True)
+            _version_error_logged = True
+        return None
+
+
+def _is_current(network, version, path):
+    if network is None:
+        return False
+    if version is not None:
+        return network.version == version
+    return network.version is None and network.mtime_ns == os.stat(path).st_mtime_ns
+
+
+def get_network():
+    """Current StationNetwork, reloaded if a newer version was uploaded or stations_data.json changed"""
+    global _network, _checked_at
+    now = time.monotonic()
+    if _network is not None and now - _checked_at < CHECK_INTERVAL_SECONDS:
+        return _network
+
+    with _reload_lock:
+        version = latest_version()
+        path = stations_data_path()
+        if version is None and not os.path.exists(path):
+            raise FileNotFoundError(f"stations_data.json not found at: {path}")
+        if not _is_current(_network, version, path):
+            if version is not None:
+                row = TrainGraph.query.filter_by(version=version).one()
+                _network = StationNetwork.from_row(row, current_app.instance_path)
+            else:
+                _network = StationNetwork.from_file(path, current_app.instance_path)
+        _checked_at = now
+    return _network
+
+
+def install(network):
+    """Make network live in this worker right away (other workers notice within CHECK_INTERVAL_SECONDS)"""
+    global _network, _checked_at
+    with _reload_lock:
+        if _network is None or _network.version is None or network.version > _network.version:
+            _network = network
+        _checked_at = time.monotonic()
@@ -0,0 +1,89 @@
+from array import array
+from collections import deque
+import json
+import mmap
+import os
+
+from app.bfs.graph import as_compiled
+
+# File layout: JSON list of station names, padded with spaces to a multiple
+# of 4 bytes and terminated by '\n', followed by the int32 predecessor matrix
+# in native byte order.
+_ALIGN = 4
+
+
+class RouteTable:
+    """
+    Precomputed shortest paths (by hop count) between every pair of stations.
+
+    `pred` is a flat V x V int32 matrix: pred[s * V + t] is the index of the
+    station just before t on the route from s to t, or -1 if t is s or is
+    unreachable. A route is read back by following predecessors from t to s,
+    so a lookup costs O(path length) and never traverses the graph.
+    Routes are identical to bfs_shortest_path's, tie-breaks included.
+    """
+
+    def __init__(self, stations, pred):
+        self.stations = stations
+        self.index = {name: i for i, name in enumerate(stations)}
+        self.pred = pred
+
+    @classmethod
+    def build(cls, graph):
+        """Run one BFS per station over a CompiledGraph (or build_graph dict)"""
+        graph = as_compiled(graph)
+        adjacency = [graph.adjacent(i) for i in range(len(graph))]
+        size = len(graph)
+        pred = array('i', [-1]) * (size * size)
+
+        for source in range(size):
+            row = source * size
+            seen = bytearray(size)
+            seen[source] = 1
+            queue = deque([source])
+            while queue:
+                current = queue.popleft()
+                for neighbor in adjacency[current]:
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        pred[row + neighbor] = current
+                        queue.append(neighbor)
+
+        return cls(list(graph.names), pred)
+
+    def path(self, start, end):
+        """Station names from start to end, or None if either is unknown or unreachable"""
+        source = self.index.get(start)
+        target = self.index.get(end)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [start]
+
+        row = source * len(self.stations)
+        if self.pred[row + target] < 0:
+            return None
+
+        route = [target]
+        while route[-1] != source:
+            route.append(self.pred[row + route[-1]])
+        return [self.stations[i] for i in reversed(route)]
+
+    def save(self, path):
+        """Write the table atomically so concurrent workers never read a partial file"""
+        header = json.dumps(self.stations).encode('utf-8')
+        header += b' ' * (-(len(header) + 1) % _ALIGN) + b'\n'
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(self.pred.tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map a saved table; every worker mapping the same file shares its pages"""
+        with open(path, 'rb') as f:
+            stations = json.loads(f.readline())
+            offset = f.tell()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(stations, memoryview(mapped)[offset:].cast('i'))
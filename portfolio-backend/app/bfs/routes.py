@@ -1,118 +1,231 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy.exc import IntegrityError
 from app import db
-from app.bfs.models import BFSOperation
-from app.bfs.utils import load_stations_data, build_graph, bfs_shortest_path, path_to_segments
+from app.bfs.batch import MAX_SEARCH_PAIRS, search_many
+from app.bfs.history import get_history_writer
+from app.bfs.models import BFSOperation, TrainGraph
+from app.bfs.network import StationNetwork, get_network, install
+from app.bfs.utils import path_to_segments, astar_path, path_distance, validate_stations_data
+from app.kv_store import kv_store
+import hmac
+import json
 
 bfs_bp = Blueprint('bfs', __name__)
 
-_graph_cache = None
-_current_path_state = None
+SEARCH_MODES = ('hops', 'distance')
+SESSION_HEADER = 'X-Session-Id'
+MAX_SESSION_ID_LENGTH = 64
 
-def get_graph():
-    global _graph_cache
-    if _graph_cache is None:
-        stations_data = load_stations_data()
-        _graph_cache = build_graph(stations_data)
-    return _graph_cache
+def check_admin_token():
+    """Return an error response unless the request carries BFS_ADMIN_TOKEN"""
+    expected = current_app.config.get('BFS_ADMIN_TOKEN')
+    if not expected:
+        return jsonify({'error': 'Admin endpoints are disabled; set BFS_ADMIN_TOKEN'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), expected):
+        return jsonify({'error': 'Invalid admin token'}), 401
+    return None
 
-def get_stations_by_line():
-    """Return stations organized by line (LRT-1, LRT-2, MRT-3, Transfers)"""
-    stations_data = load_stations_data()
-    
-    result = {
-        "lrt1": [],
-        "lrt2": [],
-        "mrt3": [],
-        "transfers": []
+def network_info(current):
+    return {
+        'version': current.version,
+        'source': 'database' if current.version is not None else 'file',
+        'stations': len(current.graph),
+        'segments': len(current.graph.neighbors) // 2,
+        'digest': current.digest
     }
-    
-    for line_name, line_data in stations_data.items():
-        segments = line_data.get('segments', [])
-        stations_set = set()
-        
-        for segment in segments:
-            stations_set.add(segment['from'])
-            stations_set.add(segment['to'])
-        
-        if line_name == "lrt1":
-            result["lrt1"] = sorted(list(stations_set))
-        elif line_name == "lrt2":
-            result["lrt2"] = sorted(list(stations_set))
-        elif line_name == "mrt3":
-            result["mrt3"] = sorted(list(stations_set))
-        elif line_name == "transfers":
-            result["transfers"] = sorted(list(stations_set))
-    
-    return result
+
+def get_session_id():
+    """
+    The X-Session-Id header a client sends to have its current path kept
+    (any id it picks), or None. Clients without one get no /current state,
+    so anonymous searches never write to the store.
+    """
+    session_id = request.headers.get(SESSION_HEADER)
+    return session_id[:MAX_SESSION_ID_LENGTH] if session_id else None
+
+def current_path_key(session_id):
+    return f'bfs:current:{session_id}'
 
 @bfs_bp.route('/search', methods=['POST'])
 def search_path():
-    global _current_path_state
-    
     data = request.get_json()
     start = data.get('start')
     end = data.get('end')
+    mode = data.get('mode') or request.args.get('mode', 'hops')
     
     if not start or not end:
         return jsonify({'error': 'start and end required'}), 400
+    if mode not in SEARCH_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(SEARCH_MODES)}"}), 400
     
-    graph = get_graph()
-    path = bfs_shortest_path(graph, start, end)
+    current = get_network()
+    if mode == 'distance':
+        found = astar_path(current.graph, start, end, current.landmarks)
+        path, distance = found if found else (None, None)
+    else:
+        path = current.hop_path(start, end)
+        distance = path_distance(current.graph, path) if path else None
     
     if not path:
         return jsonify({'error': 'No path found'}), 404
     
-    _current_path_state = path
+    session_id = get_session_id()
+    if session_id:
+        kv_store.setex(current_path_key(session_id), current_app.config['BFS_SESSION_TTL_SECONDS'], json.dumps(path))
     segments = path_to_segments(path)
     
-    operation = BFSOperation(
+    get_history_writer().record(
         start_station=start,
         end_station=end,
         path=path,
         segments=segments
     )
-    db.session.add(operation)
-    db.session.commit()
     
     return jsonify({
         'path': path,
         'segments': segments,
-        'operation_id': operation.id
+        'mode': mode,
+        'distance_km': round(distance, 3)
+    })
+
+def parse_pairs(data):
+    """
+    Read origin/destination pairs from {"pairs": [[start, end], ...]} (or
+    [{"start", "end"}, ...]) or a matrix {"origins": [...], "destinations": [...]}.
+    Returns (pairs, error).
+    """
+    if 'pairs' in data:
+        raw = data['pairs']
+        if not isinstance(raw, list):
+            return None, 'pairs must be a list'
+        if len(raw) > MAX_SEARCH_PAIRS:
+            return None, f'at most {MAX_SEARCH_PAIRS} pairs per request'
+        pairs = []
+        for item in raw:
+            if isinstance(item, dict):
+                item = (item.get('start'), item.get('end'))
+            if not isinstance(item, (list, tuple)) or len(item) != 2 or not all(isinstance(s, str) and s for s in item):
+                return None, 'each pair must be [start, end] or {"start": ..., "end": ...}'
+            pairs.append(tuple(item))
+    else:
+        origins = data.get('origins')
+        destinations = data.get('destinations')
+        if not isinstance(origins, list) or not isinstance(destinations, list):
+            return None, 'pairs, or origins and destinations lists, required'
+        # Checked before building the pairs, which would take len(origins) * len(destinations) memory
+        if len(origins) * len(destinations) > MAX_SEARCH_PAIRS:
+            return None, f'at most {MAX_SEARCH_PAIRS} pairs per request'
+        if not all(isinstance(s, str) and s for s in origins + destinations):
+            return None, 'station names must be non-empty strings'
+        pairs = [(start, end) for start in origins for end in destinations]
+    
+    if not pairs:
+        return None, 'no pairs given'
+    return pairs, None
+
+@bfs_bp.route('/search-many', methods=['POST'])
+def search_many_paths():
+    """
+    Routes for many pairs in one response; results follow the order of the
+    pairs (row-major for origins x destinations). Not recorded in history.
+    """
+    data = request.get_json(silent=True) or {}
+    mode = data.get('mode') or request.args.get('mode', 'hops')
+    if mode not in SEARCH_MODES:
+        return jsonify({'error': f"mode must be one of: {', '.join(SEARCH_MODES)}"}), 400
+    
+    pairs, error = parse_pairs(data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    routes = search_many(get_network(), pairs, mode, current_app.config.get('BFS_SEARCH_PROCESSES', 0))
+    
+    results = []
+    for (start, end), route in zip(pairs, routes):
+        if route is None:
+            results.append({'start': start, 'end': end, 'error': 'No path found'})
+        else:
+            path, distance = route
+            results.append({'start': start, 'end': end, 'path': path, 'distance_km': round(distance, 3)})
+    
+    return jsonify({
+        'mode': mode,
+        'count': len(results),
+        'found': sum(1 for route in routes if route is not None),
+        'results': results
     })
 
 @bfs_bp.route('/reset', methods=['POST'])
 def reset_path():
-    global _current_path_state
-    _current_path_state = None
+    session_id = get_session_id()
+    if session_id:
+        kv_store.delete(current_path_key(session_id))
     return jsonify({'message': 'Reset'})
 
 @bfs_bp.route('/current', methods=['GET'])
 def get_current():
-    global _current_path_state
-    if not _current_path_state:
+    session_id = get_session_id()
+    stored = kv_store.get(current_path_key(session_id)) if session_id else None
+    if not stored:
         return jsonify({'path': None, 'segments': []})
+    path = json.loads(stored)
     return jsonify({
-        'path': _current_path_state,
-        'segments': path_to_segments(_current_path_state)
+        'path': path,
+        'segments': path_to_segments(path)
     })
 
 @bfs_bp.route('/stations', methods=['GET'])
 def get_stations():
-    stations_by_line = get_stations_by_line()
-    
-    # Flatten into single array but preserve line order
-    all_stations = (
-        stations_by_line["lrt1"] + 
-        stations_by_line["lrt2"] + 
-        stations_by_line["mrt3"]
-    )
-    
-    return jsonify({
-        'stations': all_stations,
-        'by_line': stations_by_line
-    })
+    # Serialized once per stations_data.json version; clients revalidate with If-None-Match
+    current = get_network()
+    response = current_app.response_class(current.stations_body, mimetype='application/json')
+    response.set_etag(current.stations_etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @bfs_bp.route('/history', methods=['GET'])
 def get_history():
+    # Include this worker's searches that are still waiting to be written
+    get_history_writer().flush()
     operations = BFSOperation.query.order_by(BFSOperation.created_at.desc()).limit(10).all()
-    return jsonify([op.to_dict() for op in operations])
\ No newline at end of file
+    return jsonify([op.to_dict() for op in operations])
+
+@bfs_bp.route('/admin/graph', methods=['GET'])
+def get_graph_version():
+    err = check_admin_token()
+    if err:
+        return err
+    return jsonify(network_info(get_network()))
+
+@bfs_bp.route('/admin/graph', methods=['POST'])
+def upload_graph():
+    """Store a new network (stations_data.json format) as the next TrainGraph version"""
+    err = check_admin_token()
+    if err:
+        return err
+    
+    stations_data = request.get_json(silent=True)
+    error = validate_stations_data(stations_data)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    latest = db.session.query(db.func.max(TrainGraph.version)).scalar() or 0
+    uploaded = StationNetwork(stations_data, current_app.instance_path, version=latest + 1)
+    row = TrainGraph(
+        version=uploaded.version,
+        graph_data=stations_data,
+        stations_list=uploaded.graph.names
+    )
+    db.session.add(row)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Another upload created this version first; retry'}), 409
+    
+    install(uploaded)
+    return jsonify(network_info(uploaded)), 201
+
+@bfs_bp.route('/history/metrics', methods=['GET'])
+def get_history_metrics():
+    return jsonify(get_history_writer().metrics())
\ No newline at end of file
@@ -1,15 +1,23 @@
+from array import array
 from collections import deque
+import heapq
 import json
+import math
 import os
 
-def load_stations_data():
+from app.bfs.graph import CompiledGraph, as_compiled
+
+def stations_data_path():
     # Get the backend root directory (portfolio-backend/)
     backend_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     # Navigate to the frontend data folder
     json_path = os.path.join(
         backend_root, '..', 'portfolio-frontend', 'src', 'data', 'stations_data.json'
     )
-    json_path = os.path.abspath(json_path)
+    return os.path.abspath(json_path)
+
+def load_stations_data():
+    json_path = stations_data_path()
     
     if not os.path.exists(json_path):
         raise FileNotFoundError(f"stations_data.json not found at: {json_path}")
@@ -17,6 +25,31 @@ def load_stations_data():
     with open(json_path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def validate_stations_data(stations_data):
+    """Return an error message if stations_data is not shaped like stations_data.json, else None"""
+    if not isinstance(stations_data, dict) or not stations_data:
+        return 'expected an object mapping line names to {"segments": [...]}'
+    
+    segment_count = 0
+    for line_name, line_data in stations_data.items():
+        segments = line_data.get('segments') if isinstance(line_data, dict) else None
+        if not isinstance(segments, list):
+            return f'{line_name}: segments must be a list'
+        for i, segment in enumerate(segments):
+            if not isinstance(segment, dict):
+                return f'{line_name}.segments[{i}]: must be an object'
+            for key in ('from', 'to'):
+                if not isinstance(segment.get(key), str) or not segment[key].strip():
+                    return f'{line_name}.segments[{i}]: {key} must be a non-empty string'
+            distance = segment.get('distance_km')
+            if isinstance(distance, bool) or not isinstance(distance, (int, float)) or not 0 <= distance < float('inf'):
+                return f'{line_name}.segments[{i}]: distance_km must be a non-negative number'
+        segment_count += len(segments)
+    
+    if not segment_count:
+        return 'network has no segments'
+    return None
+
 def build_graph(stations_data):
     graph = {}
     for line_name, line_data in stations_data.items():
@@ -36,33 +69,229 @@ def build_graph(stations_data):
     
     return graph
 
+def iter_segments(stations_data):
+    """Yield (from_station, to_station, distance_km) for every segment of every line"""
+    for line_name, line_data in stations_data.items():
+        for segment in line_data.get('segments', []):
+            yield segment['from'], segment['to'], segment['distance_km']
+
+def compile_graph(stations_data):
+    """Build the CSR station graph directly from the stations data"""
+    return CompiledGraph.from_segments(iter_segments(stations_data))
+
 def bfs_shortest_path(graph, start, end):
-    if start not in graph or end not in graph:
+    """
+    Fewest-hops path from start to end, or None.
+    Works on a CompiledGraph (a build_graph dict is compiled first). Tracks
+    each station's predecessor in an int array instead of copying the path
+    for every enqueued station, and rebuilds the route only when end is found.
+    """
+    graph = as_compiled(graph)
+    source = graph.index.get(start)
+    target = graph.index.get(end)
+    if source is None or target is None:
         return None
     
-    if start == end:
+    if source == target:
         return [start]
     
-    queue = deque([(start, [start])])
-    visited = {start}
+    offsets, neighbors = graph.offsets, graph.neighbors
+    parent = array('i', [-1]) * len(graph)
+    parent[source] = source
+    queue = deque([source])
     
     while queue:
-        current, path = queue.popleft()
+        current = queue.popleft()
         
-        for neighbor, _ in graph[current]:
-            if neighbor in visited:
+        for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
+            if parent[neighbor] != -1:
                 continue
             
-            new_path = path + [neighbor]
+            parent[neighbor] = current
             
-            if neighbor == end:
-                return new_path
+            if neighbor == target:
+                return graph.to_names(reconstruct_path(parent, source, target))
             
-            visited.add(neighbor)
-            queue.append((neighbor, new_path))
+            queue.append(neighbor)
     
     return None
 
+def bfs_tree(graph, source):
+    """
+    Full BFS from station ID source: parent array indexed by station ID, with
+    parent[source] == source and -1 for unreachable stations. Parents are
+    assigned in the same order as bfs_shortest_path, so routes match it.
+    """
+    offsets, neighbors = graph.offsets, graph.neighbors
+    parent = array('i', [-1]) * len(graph)
+    parent[source] = source
+    queue = deque([source])
+    while queue:
+        current = queue.popleft()
+        for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
+            if parent[neighbor] == -1:
+                parent[neighbor] = current
+                queue.append(neighbor)
+    return parent
+
+def bidirectional_bfs_path(graph, start, end):
+    """
+    Fewest-hops path found by growing BFS frontiers from both ends, always
+    expanding the smaller one a whole level at a time. Visits roughly
+    2·b^(d/2) stations instead of b^d, which pays off on large networks.
+    May return a different (equally short) path than bfs_shortest_path.
+    """
+    graph = as_compiled(graph)
+    source = graph.index.get(start)
+    target = graph.index.get(end)
+    if source is None or target is None:
+        return None
+    
+    if source == target:
+        return [start]
+    
+    offsets, neighbors = graph.offsets, graph.neighbors
+    size = len(graph)
+    forward_parent = array('i', [-1]) * size
+    backward_parent = array('i', [-1]) * size
+    forward_depth = array('i', [0]) * size
+    backward_depth = array('i', [0]) * size
+    forward_parent[source] = source
+    backward_parent[target] = target
+    forward_frontier = [source]
+    backward_frontier = [target]
+    
+    while forward_frontier and backward_frontier:
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, parent, depth = forward_frontier, forward_parent, forward_depth
+            other_parent, other_depth = backward_parent, backward_depth
+        else:
+            frontier, parent, depth = backward_frontier, backward_parent, backward_depth
+            other_parent, other_depth = forward_parent, forward_depth
+        
+        next_frontier = []
+        best = None  # (hops, station on this side, station on the other side)
+        for current in frontier:
+            for neighbor in neighbors[offsets[current]:offsets[current + 1]]:
+                if other_parent[neighbor] != -1:
+                    hops = depth[current] + 1 + other_depth[neighbor]
+                    if best is None or hops < best[0]:
+                        best = (hops, current, neighbor)
+                if parent[neighbor] == -1:
+                    parent[neighbor] = current
+                    depth[neighbor] = depth[current] + 1
+                    next_frontier.append(neighbor)
+        
+        if best:
+            _, near, far = best
+            if not expand_forward:
+                near, far = far, near
+            head = reconstruct_path(forward_parent, source, near)
+            tail = reconstruct_path(backward_parent, target, far)
+            return graph.to_names(head + tail[::-1])
+        
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    
+    return None
+
+def dijkstra_distances(graph, source):
+    """distance_km from station ID source to every station ID (inf if unreachable)"""
+    return dijkstra_tree(graph, source)[0]
+
+def dijkstra_tree(graph, source):
+    """
+    Full single-source Dijkstra from station ID source, as (dist, parent)
+    arrays indexed by station ID; parent[source] is source and parent is -1
+    for unreachable stations. One tree answers every destination from source.
+    """
+    offsets, neighbors, distances = graph.offsets, graph.neighbors, graph.distances
+    dist = array('d', [math.inf]) * len(graph)
+    parent = array('i', [-1]) * len(graph)
+    dist[source] = 0.0
+    parent[source] = source
+    heap = [(0.0, source)]
+    
+    while heap:
+        d, current = heapq.heappop(heap)
+        if d > dist[current]:
+            continue
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[i]
+            candidate = d + distances[i]
+            if candidate < dist[neighbor]:
+                dist[neighbor] = candidate
+                parent[neighbor] = current
+                heapq.heappush(heap, (candidate, neighbor))
+    
+    return dist, parent
+
+def dijkstra_path(graph, start, end):
+    """
+    Shortest path by total distance_km, as (path, distance_km), or None.
+    Heap-based Dijkstra over the CompiledGraph; stops as soon as end is settled.
+    """
+    return astar_path(graph, start, end, landmarks=None)
+
+def astar_path(graph, start, end, landmarks=None):
+    """
+    Shortest path by total distance_km, as (path, distance_km), or None.
+    A* guided by the ALT lower bounds of a Landmarks instance; without
+    landmarks the heuristic is zero and this is plain Dijkstra.
+    """
+    graph = as_compiled(graph)
+    source = graph.index.get(start)
+    target = graph.index.get(end)
+    if source is None or target is None:
+        return None
+    
+    if source == target:
+        return [start], 0.0
+    
+    offsets, neighbors, distances = graph.offsets, graph.neighbors, graph.distances
+    estimate = landmarks.heuristic(target) if landmarks else lambda station: 0.0
+    dist = array('d', [math.inf]) * len(graph)
+    parent = array('i', [-1]) * len(graph)
+    dist[source] = 0.0
+    parent[source] = source
+    heap = [(estimate(source), 0.0, source)]
+    
+    while heap:
+        _, d, current = heapq.heappop(heap)
+        if current == target:
+            return graph.to_names(reconstruct_path(parent, source, target)), d
+        if d > dist[current]:
+            continue
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = neighbors[i]
+            candidate = d + distances[i]
+            if candidate < dist[neighbor]:
+                dist[neighbor] = candidate
+                parent[neighbor] = current
+                heapq.heappush(heap, (candidate + estimate(neighbor), candidate, neighbor))
+    
+    return None
+
+def path_distance(graph, path):
+    """Total distance_km along a path of station names (shortest segment between each pair)"""
+    graph = as_compiled(graph)
+    total = 0.0
+    for a, b in zip(path, path[1:]):
+        target = graph.index[b]
+        total += min(d for neighbor, d in graph.edges(graph.index[a]) if neighbor == target)
+    return total
+
+def reconstruct_path(parent, source, end):
+    """Follow predecessor IDs back from end to source and return the IDs source -> end"""
+    path = [end]
+    while path[-1] != source:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
 def path_to_segments(path):
     if not path or len(path) < 2:
         return []
@@ -0,0 +1,79 @@
+"""
+Small shared key-value store with per-key TTLs.
+
+Rows live in the key_value_entry table of the app's database, so every
+worker process sees the same data. The methods mirror the redis-py subset
+they implement (get, set with ex=, setex, delete), with string values, so
+a redis.Redis client could be dropped in where one is available.
+
+Expired keys read as missing straight away and are deleted in bulk at
+most once per PURGE_INTERVAL_SECONDS by whichever worker writes next.
+"""
+from datetime import datetime, timedelta
+import threading
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import KeyValueEntry
+
+PURGE_INTERVAL_SECONDS = 60
+
+
+class KeyValueStore:
+    def __init__(self):
+        self._last_purge = 0.0
+        self._purge_lock = threading.Lock()
+
+    def get(self, key):
+        """Value stored under key, or None if missing or expired"""
+        entry = db.session.get(KeyValueEntry, key)
+        if entry is None or (entry.expires_at is not None and entry.expires_at <= datetime.utcnow()):
+            return None
+        return entry.value
+
+    def set(self, key, value, ex=None):
+        """Store value under key, expiring after ex seconds (None = never)"""
+        expires_at = datetime.utcnow() + timedelta(seconds=ex) if ex else None
+        entry = KeyValueEntry(key=key, value=value, expires_at=expires_at)
+        try:
+            db.session.merge(entry)
+            db.session.commit()
+        except IntegrityError:
+            # Another worker inserted the same key between merge's SELECT and INSERT
+            db.session.rollback()
+            db.session.merge(entry)
+            db.session.commit()
+        self._maybe_purge()
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def delete(self, key):
+        """Remove key; returns 1 if it existed, else 0"""
+        deleted = KeyValueEntry.query.filter_by(key=key).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def purge_expired(self):
+        """Delete every expired key; returns how many"""
+        deleted = KeyValueEntry.query.filter(
+            KeyValueEntry.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def _maybe_purge(self):
+        now = time.monotonic()
+        if now - self._last_purge < PURGE_INTERVAL_SECONDS or not self._purge_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_purge = now
+            self.purge_expired()
+        finally:
+            self._purge_lock.release()
+
+
+kv_store = KeyValueStore()
@@ -1,7 +1,5 @@
 from app import db
 from datetime import datetime
-from sqlalchemy.ext.mutable import MutableList
-from sqlalchemy import PickleType
 
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -21,14 +19,45 @@ class Project(db.Model):
 
 class QueueOperation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    queue_data = db.Column(MutableList.as_mutable(PickleType), default=[])
+    name = db.Column(db.String(100), nullable=False, unique=True, index=True)
+    # Items live in queue_item rows numbered head..tail-1
+    head = db.Column(db.Integer, nullable=False, default=0)
+    tail = db.Column(db.Integer, nullable=False, default=0)
     
     def to_dict(self):
-        return {'id': self.id, 'queue_data': self.queue_data or []}
+        items = QueueItem.query.filter_by(queue_id=self.id).order_by(QueueItem.seq)
+        return {'id': self.id, 'name': self.name, 'queue_data': [item.value for item in items]}
+
+class QueueItem(db.Model):
+    __tablename__ = 'queue_item'
+    
+    queue_id = db.Column(db.Integer, db.ForeignKey('queue_operation.id'), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.JSON)
 
 class DequeOperation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    deque_data = db.Column(MutableList.as_mutable(PickleType), default=[])
+    name = db.Column(db.String(100), nullable=False, unique=True, index=True)
+    # Items live in deque_item rows numbered head..tail-1; head grows
+    # downwards past zero on head pushes, tail grows upwards on tail pushes
+    head = db.Column(db.Integer, nullable=False, default=0)
+    tail = db.Column(db.Integer, nullable=False, default=0)
     
     def to_dict(self):
-        return {'id': self.id, 'deque_data': self.deque_data or []}
\ No newline at end of file
+        items = DequeItem.query.filter_by(deque_id=self.id).order_by(DequeItem.seq)
+        return {'id': self.id, 'name': self.name, 'deque_data': [item.value for item in items]}
+
+class DequeItem(db.Model):
+    __tablename__ = 'deque_item'
+    
+    deque_id = db.Column(db.Integer, db.ForeignKey('deque_operation.id'), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.JSON)
+
+class KeyValueEntry(db.Model):
+    """Row behind app.kv_store.KeyValueStore"""
+    __tablename__ = 'key_value_entry'
+    
+    key = db.Column(db.String(200), primary_key=True)
+    value = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)  # None = never
@@ -0,0 +1,3 @@
+from app.priority_queue.routes import priority_queue_bp
+
+__all__ = ['priority_queue_bp']
\ No newline at end of file
@@ -0,0 +1,23 @@
+from app import db
+from datetime import datetime
+
+class PriorityQueueItem(db.Model):
+    __tablename__ = 'priority_queue_item'
+    # Highest priority first, FIFO among equal priorities. The B-tree index
+    # keeps items in heap order, so peek/pop are O(log n) index seeks.
+    __table_args__ = (
+        db.Index('ix_priority_queue_item_order', db.desc('priority'), 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    priority = db.Column(db.Float, nullable=False)
+    value = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'priority': self.priority,
+            'value': self.value,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
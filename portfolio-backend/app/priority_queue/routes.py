@@ -0,0 +1,63 @@
+import math
+
+from flask import Blueprint, jsonify, request
+from app import db
+from app.priority_queue.models import PriorityQueueItem
+from app.priority_queue.utils import pq_push, pq_pop, pq_peek, pq_top
+
+priority_queue_bp = Blueprint('priority_queue', __name__)
+
+TOP_LIMIT = 100
+
+
+@priority_queue_bp.route('', methods=['GET'])
+def get_priority_queue():
+    """Get the size and the highest-priority items (?limit=N, default 100)"""
+    limit = min(max(request.args.get('limit', TOP_LIMIT, type=int), 1), TOP_LIMIT)
+    return jsonify({
+        'size': PriorityQueueItem.query.count(),
+        'items': [item.to_dict() for item in pq_top(limit)]
+    })
+
+
+@priority_queue_bp.route('/push', methods=['POST'])
+def push():
+    """Push a value with a numeric priority (higher pops first)"""
+    data = request.get_json() or {}
+    if 'value' not in data:
+        return jsonify({'error': 'value is required'}), 400
+    
+    priority = data.get('priority')
+    try:
+        if isinstance(priority, bool):
+            raise TypeError
+        priority = float(priority)
+    except (ValueError, TypeError):
+        return jsonify({'error': 'priority must be a number'}), 400
+    if not math.isfinite(priority):
+        return jsonify({'error': 'priority must be finite'}), 400
+    
+    item = pq_push(data['value'], priority)
+    db.session.commit()
+    return jsonify(item.to_dict()), 201
+
+
+@priority_queue_bp.route('/pop', methods=['POST'])
+def pop():
+    """Remove and return the highest-priority item"""
+    item = pq_pop()
+    if not item:
+        return jsonify({'error': 'Priority queue is empty'}), 400
+    
+    removed = item.to_dict()
+    db.session.commit()
+    return jsonify({'removed': removed})
+
+
+@priority_queue_bp.route('/peek', methods=['GET'])
+def peek():
+    """Return the highest-priority item without removing it"""
+    item = pq_peek()
+    if not item:
+        return jsonify({'error': 'Priority queue is empty'}), 400
+    return jsonify(item.to_dict())
@@ -0,0 +1,39 @@
+from sqlalchemy import text
+from app import db
+from app.priority_queue.models import PriorityQueueItem
+
+
+def _in_order():
+    return PriorityQueueItem.query.order_by(PriorityQueueItem.priority.desc(), PriorityQueueItem.id)
+
+
+def pq_push(value, priority):
+    """Insert a value; O(log n) index insert"""
+    item = PriorityQueueItem(value=value, priority=priority)
+    db.session.add(item)
+    return item
+
+
+def pq_peek():
+    """Highest-priority item without removing it, or None"""
+    return _in_order().first()
+
+
+def pq_pop():
+    """
+    Remove and return the highest-priority item, or None.
+    Claims the row atomically: SQLite takes the write lock up front with
+    BEGIN IMMEDIATE, other backends lock the top row and skip rows already
+    claimed by concurrent pops.
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        db.session.execute(text('BEGIN IMMEDIATE'))
+    item = _in_order().with_for_update(skip_locked=True).first()
+    if item:
+        db.session.delete(item)
+    return item
+
+
+def pq_top(limit):
+    """The `limit` highest-priority items, in pop order"""
+    return _in_order().limit(limit).all()
@@ -0,0 +1,207 @@
+from sqlalchemy import text
+from app import db
+from app.models import QueueItem, DequeItem
+import threading
+
+PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+EXPORT_BATCH_SIZE = 1000
+MAX_WAIT_SECONDS = 30
+# Parked dequeues are woken by enqueues in the same process; this bounds how
+# long they can miss an enqueue handled by another worker process
+WAIT_RECHECK_SECONDS = 1.0
+
+
+class ItemSignal:
+    """Wakes long-polling dequeues when an enqueue adds items to a container"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.versions = {}
+
+    def version(self, key):
+        with self.condition:
+            return self.versions.get(key, 0)
+
+    def notify(self, key):
+        with self.condition:
+            self.versions[key] = self.versions.get(key, 0) + 1
+            self.condition.notify_all()
+
+    def wait(self, key, seen, timeout):
+        """Block until notify(key) has been called since version `seen` was read, or timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.versions.get(key, 0) != seen, timeout)
+
+
+item_signal = ItemSignal()
+
+
+def lock_container(model, name):
+    """
+    Load a queue/deque pointer row so that no other worker can read or move
+    its head/tail until the current transaction ends.
+    SQLite has no row locks, so BEGIN IMMEDIATE takes the database write lock
+    up front; other backends use SELECT ... FOR UPDATE on the single row.
+    Must be the first statement of the transaction.
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        db.session.execute(text('BEGIN IMMEDIATE'))
+    return model.query.filter_by(name=name).with_for_update().populate_existing().first()
+
+
+def queue_length(queue):
+    """Number of items currently stored in the queue"""
+    return queue.tail - queue.head
+
+
+def queue_push(queue, value):
+    """Append a value at the tail of the queue (single INSERT)"""
+    db.session.add(QueueItem(queue_id=queue.id, seq=queue.tail, value=value))
+    queue.tail += 1
+
+
+def queue_pop(queue):
+    """Remove and return the value at the head of the queue (primary key lookup + DELETE)"""
+    item = db.session.get(QueueItem, (queue.id, queue.head))
+    db.session.delete(item)
+    queue.head += 1
+    return item.value
+
+
+def _queue_range(queue_id, start, end):
+    return QueueItem.query.filter(
+        QueueItem.queue_id == queue_id, QueueItem.seq >= start, QueueItem.seq < end
+    )
+
+
+def queue_push_many(queue, values):
+    """Append several values at the tail of the queue in one batched INSERT"""
+    db.session.add_all([
+        QueueItem(queue_id=queue.id, seq=queue.tail + offset, value=value)
+        for offset, value in enumerate(values)
+    ])
+    queue.tail += len(values)
+
+
+def queue_pop_many(queue, count):
+    """Remove and return up to `count` values from the head of the queue, oldest first"""
+    end = min(queue.head + count, queue.tail)
+    items = _queue_range(queue.id, queue.head, end)
+    values = [item.value for item in items.order_by(QueueItem.seq)]
+    items.delete(synchronize_session=False)
+    queue.head = end
+    return values
+
+
+def queue_page(queue, after=None, limit=PAGE_LIMIT):
+    """Return up to `limit` (seq, value) pairs following sequence number `after`"""
+    start = queue.head if after is None else max(after + 1, queue.head)
+    items = _queue_range(queue.id, start, min(start + limit, queue.tail))
+    return [(item.seq, item.value) for item in items.order_by(QueueItem.seq)]
+
+
+def iter_queue_values(queue, batch_size=EXPORT_BATCH_SIZE):
+    """Lazily yield every queued value, reading `batch_size` rows per query"""
+    queue_id, head, tail = queue.id, queue.head, queue.tail
+    for start in range(head, tail, batch_size):
+        rows = (_queue_range(queue_id, start, min(start + batch_size, tail))
+                .with_entities(QueueItem.value).order_by(QueueItem.seq))
+        for (value,) in rows:
+            yield value
+
+
+def deque_length(deque):
+    """Number of items currently stored in the deque"""
+    return deque.tail - deque.head
+
+
+def deque_push_tail(deque, value):
+    """Append a value at the tail of the deque"""
+    db.session.add(DequeItem(deque_id=deque.id, seq=deque.tail, value=value))
+    deque.tail += 1
+
+
+def deque_push_head(deque, value):
+    """Prepend a value at the head of the deque using the next negative sequence number"""
+    deque.head -= 1
+    db.session.add(DequeItem(deque_id=deque.id, seq=deque.head, value=value))
+
+
+def deque_pop_head(deque):
+    """Remove and return the value at the head of the deque"""
+    item = db.session.get(DequeItem, (deque.id, deque.head))
+    db.session.delete(item)
+    deque.head += 1
+    return item.value
+
+
+def deque_pop_tail(deque):
+    """Remove and return the value at the tail of the deque"""
+    deque.tail -= 1
+    item = db.session.get(DequeItem, (deque.id, deque.tail))
+    db.session.delete(item)
+    return item.value
+
+
+def _deque_range(deque_id, start, end):
+    return DequeItem.query.filter(
+        DequeItem.deque_id == deque_id, DequeItem.seq >= start, DequeItem.seq < end
+    )
+
+
+def deque_push_tail_many(deque, values):
+    """Append several values at the tail of the deque, in order"""
+    db.session.add_all([
+        DequeItem(deque_id=deque.id, seq=deque.tail + offset, value=value)
+        for offset, value in enumerate(values)
+    ])
+    deque.tail += len(values)
+
+
+def deque_push_head_many(deque, values):
+    """Push several values at the head of the deque, one after another,
+    so the last value ends up first (same as repeated enqueue-head calls)"""
+    db.session.add_all([
+        DequeItem(deque_id=deque.id, seq=deque.head - 1 - offset, value=value)
+        for offset, value in enumerate(values)
+    ])
+    deque.head -= len(values)
+
+
+def deque_pop_head_many(deque, count):
+    """Remove and return up to `count` values from the head of the deque, head first"""
+    end = min(deque.head + count, deque.tail)
+    items = _deque_range(deque.id, deque.head, end)
+    values = [item.value for item in items.order_by(DequeItem.seq)]
+    items.delete(synchronize_session=False)
+    deque.head = end
+    return values
+
+
+def deque_pop_tail_many(deque, count):
+    """Remove and return up to `count` values from the tail of the deque, tail first"""
+    start = max(deque.tail - count, deque.head)
+    items = _deque_range(deque.id, start, deque.tail)
+    values = [item.value for item in items.order_by(DequeItem.seq.desc())]
+    items.delete(synchronize_session=False)
+    deque.tail = start
+    return values
+
+
+
+def deque_page(deque, after=None, limit=PAGE_LIMIT):
+    """Return up to `limit` (seq, value) pairs following sequence number `after`"""
+    start = deque.head if after is None else max(after + 1, deque.head)
+    items = _deque_range(deque.id, start, min(start + limit, deque.tail))
+    return [(item.seq, item.value) for item in items.order_by(DequeItem.seq)]
+
+
+def iter_deque_values(deque, batch_size=EXPORT_BATCH_SIZE):
+    """Lazily yield every value in the deque, head first, reading `batch_size` rows per query"""
+    deque_id, head, tail = deque.id, deque.head, deque.tail
+    for start in range(head, tail, batch_size):
+        rows = (_deque_range(deque_id, start, min(start + batch_size, tail))
+                .with_entities(DequeItem.value).order_by(DequeItem.seq))
+        for (value,) in rows:
+            yield value
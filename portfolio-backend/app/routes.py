@@ -1,28 +1,131 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models import Project, QueueOperation, DequeOperation
+from app.queue_dequeue import (
+    PAGE_LIMIT, MAX_PAGE_LIMIT, MAX_WAIT_SECONDS, WAIT_RECHECK_SECONDS, lock_container, item_signal,
+    queue_length, queue_push, queue_pop, queue_push_many, queue_pop_many,
+    queue_page, iter_queue_values,
+    deque_length, deque_push_head, deque_push_tail, deque_pop_head, deque_pop_tail,
+    deque_push_head_many, deque_push_tail_many, deque_pop_head_many, deque_pop_tail_many,
+    deque_page, iter_deque_values
+)
+import json
+import time
 
 main = Blueprint('main', __name__)
 
+DEFAULT_NAME = 'default'
+
 # Helper functions
 def get_or_create(model, **kwargs):
-    instance = model.query.first()
+    instance = model.query.filter_by(**kwargs).first()
     if not instance:
         instance = model(**kwargs)
         db.session.add(instance)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker created it first
+            db.session.rollback()
+            instance = model.query.filter_by(**kwargs).one()
     return instance
 
+def get_for_update(model, name):
+    """Like get_or_create, but the row stays locked until the request commits"""
+    instance = lock_container(model, name)
+    if not instance:
+        db.session.rollback()
+        get_or_create(model, name=name)
+        instance = lock_container(model, name)
+    return instance
+
+def peek_length(model, name, length):
+    """The container's length from a plain read, without taking the row (or SQLite database) lock"""
+    instance = model.query.filter_by(name=name).populate_existing().first()
+    size = length(instance) if instance else 0
+    db.session.rollback()
+    return size
+
+def get_nonempty_for_update(model, name, length, wait):
+    """
+    get_for_update, but if the container is empty wait up to `wait` seconds
+    for an enqueue to signal new items. While waiting, rechecks are plain
+    reads; the lock is only taken once items show up or the wait is over.
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        seen = item_signal.version((model, name))
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or peek_length(model, name, length):
+            instance = get_for_update(model, name)
+            if length(instance) or deadline - time.monotonic() <= 0:
+                return instance
+            # Another consumer got there first
+            db.session.rollback()
+            remaining = deadline - time.monotonic()
+        item_signal.wait((model, name), seen, min(remaining, WAIT_RECHECK_SECONDS))
+
+def get_wait():
+    wait = request.args.get('wait', 0, type=float)
+    return min(max(wait, 0), MAX_WAIT_SECONDS)
+
 def validate_value(data):
     if 'value' not in data:
         return jsonify({'error': 'Value is required'}), 400
     return None
 
+def validate_values(data):
+    values = data.get('values')
+    if not isinstance(values, list) or not values:
+        return jsonify({'error': 'values must be a non-empty list'}), 400
+    return None
+
+def get_count():
+    count = request.args.get('count', 1, type=int)
+    if count < 1:
+        return None, (jsonify({'error': 'count must be a positive integer'}), 400)
+    return count, None
+
 def handle_empty(data, error_msg):
     if not data:
         return jsonify({'error': error_msg}), 400
     return None
 
+def get_page_args():
+    after = request.args.get('after', type=int)
+    limit = request.args.get('limit', PAGE_LIMIT, type=int)
+    if limit < 1:
+        return None, None, (jsonify({'error': 'limit must be a positive integer'}), 400)
+    return after, min(limit, MAX_PAGE_LIMIT), None
+
+def wants_pagination():
+    return 'after' in request.args or 'limit' in request.args
+
+def page_response(container, key, page, length):
+    return jsonify({
+        'id': container.id,
+        'name': container.name,
+        key: [value for _, value in page],
+        'length': length,
+        'next_cursor': page[-1][0] if page and page[-1][0] < container.tail - 1 else None
+    })
+
+def wants_compact():
+    return request.args.get('compact', '').lower() in ('1', 'true')
+
+def mutation_response(container, length, key=None, **affected):
+    """Echo the whole container, or only the affected element(s) and new length with ?compact=true"""
+    if wants_compact():
+        return jsonify({'id': container.id, 'name': container.name, 'length': length, **affected})
+    if key is None:
+        return jsonify(container.to_dict())
+    return jsonify({**affected, key: container.to_dict()})
+
+def ndjson_response(values):
+    lines = (json.dumps(value) + '\n' for value in values)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
 @main.route('/')
 def index():
     return jsonify({'message': 'Welcome to Portfolio API'})
@@ -61,63 +164,185 @@ def delete_project(id):
     db.session.commit()
     return jsonify({'message': 'Project deleted successfully'})
 
+def list_containers(model):
+    """Name and length of every container, read from the pointer columns only"""
+    rows = model.query.with_entities(model.name, model.head, model.tail).order_by(model.name)
+    return jsonify([{'name': name, 'length': tail - head} for name, head, tail in rows])
+
 # Queue routes
-@main.route('/queue', methods=['GET'])
-def get_queue():
-    return jsonify(get_or_create(QueueOperation, queue_data=[]).to_dict())
+@main.route('/queues', methods=['GET'])
+def list_queues():
+    return list_containers(QueueOperation)
+
+@main.route('/queue', methods=['GET'], defaults={'name': DEFAULT_NAME})
+@main.route('/queues/<name>', methods=['GET'])
+def get_queue(name):
+    q = get_or_create(QueueOperation, name=name)
+    if not wants_pagination():
+        return jsonify(q.to_dict())
+    after, limit, err = get_page_args()
+    if err: return err
+    return page_response(q, 'queue_data', queue_page(q, after, limit), queue_length(q))
+
+@main.route('/queue/summary', methods=['GET'], defaults={'name': DEFAULT_NAME})
+@main.route('/queues/<name>/summary', methods=['GET'])
+def get_queue_summary(name):
+    q = get_or_create(QueueOperation, name=name)
+    return jsonify({'id': q.id, 'name': q.name, 'length': queue_length(q)})
 
-@main.route('/queue/enqueue', methods=['POST'])
-def enqueue():
+@main.route('/queue/export', methods=['GET'], defaults={'name': DEFAULT_NAME})
+@main.route('/queues/<name>/export', methods=['GET'])
+def export_queue(name):
+    return ndjson_response(iter_queue_values(get_or_create(QueueOperation, name=name)))
+
+@main.route('/queue/enqueue', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/queues/<name>/enqueue', methods=['POST'])
+def enqueue(name):
     data = request.get_json() or {}
     if err := validate_value(data): return err
-    q = get_or_create(QueueOperation, queue_data=[])
-    q.queue_data.append(data['value'])
+    q = get_for_update(QueueOperation, name)
+    queue_push(q, data['value'])
+    db.session.commit()
+    item_signal.notify((QueueOperation, name))
+    return mutation_response(q, queue_length(q), value=data['value'])
+
+@main.route('/queue/dequeue', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/queues/<name>/dequeue', methods=['POST'])
+def dequeue(name):
+    q = get_nonempty_for_update(QueueOperation, name, queue_length, get_wait())
+    if err := handle_empty(queue_length(q), 'Queue is empty'): return err
+    removed = queue_pop(q)
+    db.session.commit()
+    return mutation_response(q, queue_length(q), 'queue', removed=removed)
+
+@main.route('/queue/enqueue-many', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/queues/<name>/enqueue-many', methods=['POST'])
+def enqueue_many(name):
+    data = request.get_json() or {}
+    if err := validate_values(data): return err
+    q = get_for_update(QueueOperation, name)
+    queue_push_many(q, data['values'])
     db.session.commit()
-    return jsonify(q.to_dict())
+    item_signal.notify((QueueOperation, name))
+    return mutation_response(q, queue_length(q), count=len(data['values']))
 
-@main.route('/queue/dequeue', methods=['POST'])
-def dequeue():
-    q = get_or_create(QueueOperation, queue_data=[])
-    if err := handle_empty(q.queue_data, 'Queue is empty'): return err
-    removed = q.queue_data.pop(0)
+@main.route('/queue/dequeue-many', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/queues/<name>/dequeue-many', methods=['POST'])
+def dequeue_many(name):
+    count, err = get_count()
+    if err: return err
+    q = get_nonempty_for_update(QueueOperation, name, queue_length, get_wait())
+    if err := handle_empty(queue_length(q), 'Queue is empty'): return err
+    removed = queue_pop_many(q, count)
     db.session.commit()
-    return jsonify({'removed': removed, 'queue': q.to_dict()})
+    return mutation_response(q, queue_length(q), 'queue', removed=removed)
 
 # Deque routes
-@main.route('/deque', methods=['GET'])
-def get_deque():
-    return jsonify(get_or_create(DequeOperation, deque_data=[]).to_dict())
+@main.route('/deques', methods=['GET'])
+def list_deques():
+    return list_containers(DequeOperation)
+
+@main.route('/deque', methods=['GET'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>', methods=['GET'])
+def get_deque(name):
+    d = get_or_create(DequeOperation, name=name)
+    if not wants_pagination():
+        return jsonify(d.to_dict())
+    after, limit, err = get_page_args()
+    if err: return err
+    return page_response(d, 'deque_data', deque_page(d, after, limit), deque_length(d))
+
+@main.route('/deque/summary', methods=['GET'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/summary', methods=['GET'])
+def get_deque_summary(name):
+    d = get_or_create(DequeOperation, name=name)
+    return jsonify({'id': d.id, 'name': d.name, 'length': deque_length(d)})
 
-@main.route('/deque/enqueue', methods=['POST'])
-def deque_enqueue():
+@main.route('/deque/export', methods=['GET'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/export', methods=['GET'])
+def export_deque(name):
+    return ndjson_response(iter_deque_values(get_or_create(DequeOperation, name=name)))
+
+@main.route('/deque/enqueue', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/enqueue', methods=['POST'])
+def deque_enqueue(name):
     data = request.get_json() or {}
     if err := validate_value(data): return err
-    d = get_or_create(DequeOperation, deque_data=[])
-    d.deque_data.append(data['value'])
+    d = get_for_update(DequeOperation, name)
+    deque_push_tail(d, data['value'])
     db.session.commit()
-    return jsonify(d.to_dict())
+    item_signal.notify((DequeOperation, name))
+    return mutation_response(d, deque_length(d), value=data['value'])
 
-@main.route('/deque/dequeue', methods=['POST'])
-def deque_dequeue():
-    d = get_or_create(DequeOperation, deque_data=[])
-    if err := handle_empty(d.deque_data, 'Deque is empty'): return err
-    removed = d.deque_data.pop(0)
+@main.route('/deque/dequeue', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/dequeue', methods=['POST'])
+def deque_dequeue(name):
+    d = get_nonempty_for_update(DequeOperation, name, deque_length, get_wait())
+    if err := handle_empty(deque_length(d), 'Deque is empty'): return err
+    removed = deque_pop_head(d)
     db.session.commit()
-    return jsonify({'removed': removed, 'deque': d.to_dict()})
+    return mutation_response(d, deque_length(d), 'deque', removed=removed)
 
-@main.route('/deque/enqueue-head', methods=['POST'])
-def deque_enqueue_head():
+@main.route('/deque/enqueue-head', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/enqueue-head', methods=['POST'])
+def deque_enqueue_head(name):
     data = request.get_json() or {}
     if err := validate_value(data): return err
-    d = get_or_create(DequeOperation, deque_data=[])
-    d.deque_data.insert(0, data['value'])
+    d = get_for_update(DequeOperation, name)
+    deque_push_head(d, data['value'])
+    db.session.commit()
+    item_signal.notify((DequeOperation, name))
+    return mutation_response(d, deque_length(d), value=data['value'])
+
+@main.route('/deque/dequeue-tail', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/dequeue-tail', methods=['POST'])
+def deque_dequeue_tail(name):
+    d = get_nonempty_for_update(DequeOperation, name, deque_length, get_wait())
+    if err := handle_empty(deque_length(d), 'Deque is empty'): return err
+    removed = deque_pop_tail(d)
+    db.session.commit()
+    return mutation_response(d, deque_length(d), 'deque', removed=removed)
+
+@main.route('/deque/enqueue-many', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/enqueue-many', methods=['POST'])
+def deque_enqueue_many(name):
+    data = request.get_json() or {}
+    if err := validate_values(data): return err
+    d = get_for_update(DequeOperation, name)
+    deque_push_tail_many(d, data['values'])
+    db.session.commit()
+    item_signal.notify((DequeOperation, name))
+    return mutation_response(d, deque_length(d), count=len(data['values']))
+
+@main.route('/deque/enqueue-head-many', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/enqueue-head-many', methods=['POST'])
+def deque_enqueue_head_many(name):
+    data = request.get_json() or {}
+    if err := validate_values(data): return err
+    d = get_for_update(DequeOperation, name)
+    deque_push_head_many(d, data['values'])
+    db.session.commit()
+    item_signal.notify((DequeOperation, name))
+    return mutation_response(d, deque_length(d), count=len(data['values']))
+
+@main.route('/deque/dequeue-many', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/dequeue-many', methods=['POST'])
+def deque_dequeue_many(name):
+    count, err = get_count()
+    if err: return err
+    d = get_nonempty_for_update(DequeOperation, name, deque_length, get_wait())
+    if err := handle_empty(deque_length(d), 'Deque is empty'): return err
+    removed = deque_pop_head_many(d, count)
     db.session.commit()
-    return jsonify(d.to_dict())
+    return mutation_response(d, deque_length(d), 'deque', removed=removed)
 
-@main.route('/deque/dequeue-tail', methods=['POST'])
-def deque_dequeue_tail():
-    d = get_or_create(DequeOperation, deque_data=[])
-    if err := handle_empty(d.deque_data, 'Deque is empty'): return err
-    removed = d.deque_data.pop()
+@main.route('/deque/dequeue-tail-many', methods=['POST'], defaults={'name': DEFAULT_NAME})
+@main.route('/deques/<name>/dequeue-tail-many', methods=['POST'])
+def deque_dequeue_tail_many(name):
+    count, err = get_count()
+    if err: return err
+    d = get_nonempty_for_update(DequeOperation, name, deque_length, get_wait())
+    if err := handle_empty(deque_length(d), 'Deque is empty'): return err
+    removed = deque_pop_tail_many(d, count)
     db.session.commit()
-    return jsonify({'removed': removed, 'deque': d.to_dict()})
\ No newline at end of file
+    return mutation_response(d, deque_length(d), 'deque', removed=removed)
\ No newline at end of file
@@ -0,0 +1,207 @@
+from app.sorting_algorithms.utils import RADIX_BASE, _min_run
+
+# Counter-only versions of the step generators in utils.py, for requests that
+# only want the output. Each sorts `array` in place, records nothing but
+# operation counts, and returns them:
+#   comparisons  element comparisons evaluated
+#   swaps        exchanges of two elements
+#   writes       single-element writes (shifts, key placements, merge and
+#                bucket writes)
+
+
+def new_counts():
+    return {'comparisons': 0, 'swaps': 0, 'writes': 0}
+
+
+def bubble_sort_count(array):
+    counts = new_counts()
+    n = len(array)
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            counts['comparisons'] += 1
+            if array[j] > array[j + 1]:
+                array[j], array[j + 1] = array[j + 1], array[j]
+                counts['swaps'] += 1
+    return counts
+
+
+def selection_sort_count(array):
+    counts = new_counts()
+    n = len(array)
+    for i in range(n):
+        min_idx = i
+        for j in range(i + 1, n):
+            counts['comparisons'] += 1
+            if array[j] < array[min_idx]:
+                min_idx = j
+        if min_idx != i:
+            array[i], array[min_idx] = array[min_idx], array[i]
+            counts['swaps'] += 1
+    return counts
+
+
+def _insertion_count(array, counts, lo, hi, gap=1):
+    for i in range(lo + gap, hi):
+        key = array[i]
+        j = i - gap
+        while j >= lo:
+            counts['comparisons'] += 1
+            if not array[j] > key:
+                break
+            array[j + gap] = array[j]
+            counts['writes'] += 1
+            j -= gap
+        array[j + gap] = key
+        counts['writes'] += 1
+
+
+def _merge_count(array, counts, left, mid, right):
+    left_arr = array[left:mid + 1]
+    right_arr = array[mid + 1:right + 1]
+    i = j = 0
+    k = left
+    while i < len(left_arr) and j < len(right_arr):
+        counts['comparisons'] += 1
+        if left_arr[i] <= right_arr[j]:
+            array[k] = left_arr[i]
+            i += 1
+        else:
+            array[k] = right_arr[j]
+            j += 1
+        k += 1
+    rest = left_arr[i:] + right_arr[j:]
+    array[k:k + len(rest)] = rest
+    counts['writes'] += right - left + 1
+
+
+def insertion_sort_count(array):
+    counts = new_counts()
+    _insertion_count(array, counts, 0, len(array))
+    return counts
+
+
+def quick_sort_count(array):
+    counts = new_counts()
+    stack = [(0, len(array) - 1)]
+    while stack:
+        low, high = stack.pop()
+        if low >= high:
+            continue
+        pivot = array[high]
+        i = low - 1
+        for j in range(low, high):
+            counts['comparisons'] += 1
+            if array[j] < pivot:
+                i += 1
+                array[i], array[j] = array[j], array[i]
+                counts['swaps'] += 1
+        array[i + 1], array[high] = array[high], array[i + 1]
+        counts['swaps'] += 1
+        stack.append((i + 2, high))
+        stack.append((low, i))
+    return counts
+
+
+def merge_sort_count(array):
+    counts = new_counts()
+
+    def merge_sort(left, right):
+        if left < right:
+            mid = (left + right) // 2
+            merge_sort(left, mid)
+            merge_sort(mid + 1, right)
+            _merge_count(array, counts, left, mid, right)
+
+    merge_sort(0, len(array) - 1)
+    return counts
+
+
+def heap_sort_count(array):
+    counts = new_counts()
+    n = len(array)
+
+    def sift_down(root, end):
+        while True:
+            largest = root
+            for child in (2 * root + 1, 2 * root + 2):
+                if child < end:
+                    counts['comparisons'] += 1
+                    if array[child] > array[largest]:
+                        largest = child
+            if largest == root:
+                return
+            array[root], array[largest] = array[largest], array[root]
+            counts['swaps'] += 1
+            root = largest
+
+    for start in range(n // 2 - 1, -1, -1):
+        sift_down(start, n)
+    for end in range(n - 1, 0, -1):
+        array[0], array[end] = array[end], array[0]
+        counts['swaps'] += 1
+        sift_down(0, end)
+    return counts
+
+
+def shell_sort_count(array):
+    counts = new_counts()
+    n = len(array)
+    gap = 1
+    while gap < n // 3:
+        gap = 3 * gap + 1
+    while gap >= 1:
+        _insertion_count(array, counts, 0, n, gap)
+        gap //= 3
+    return counts
+
+
+def counting_sort_count(array):
+    counts = new_counts()
+    if not array:
+        return counts
+    lo = min(array)
+    tally = [0] * (max(array) - lo + 1)
+    for value in array:
+        tally[value - lo] += 1
+    k = 0
+    for offset, count in enumerate(tally):
+        array[k:k + count] = [offset + lo] * count
+        k += count
+    counts['writes'] = len(array)
+    return counts
+
+
+def radix_sort_count(array):
+    counts = new_counts()
+    if not array:
+        return counts
+    lo = min(array)
+    largest = max(array) - lo
+    exp = 1
+    while True:
+        buckets = [[] for _ in range(RADIX_BASE)]
+        for value in array:
+            buckets[(value - lo) // exp % RADIX_BASE].append(value)
+        array[:] = [value for bucket in buckets for value in bucket]
+        counts['writes'] += len(array)
+        exp *= RADIX_BASE
+        if largest // exp == 0:
+            break
+    return counts
+
+
+def tim_sort_count(array):
+    counts = new_counts()
+    n = len(array)
+    run = max(_min_run(n), 1)
+    for start in range(0, n, run):
+        _insertion_count(array, counts, start, min(start + run, n))
+    size = run
+    while size < n:
+        for left in range(0, n, 2 * size):
+            mid = min(left + size - 1, n - 1)
+            right = min(left + 2 * size - 1, n - 1)
+            if mid < right:
+                _merge_count(array, counts, left, mid, right)
+        size *= 2
+    return counts
@@ -7,7 +7,7 @@ class SortingAlgorithmOperation(db.Model):
     algorithm_name = db.Column(db.String(100), nullable=False)
     input_array = db.Column(db.JSON, nullable=False)
     output_array = db.Column(db.JSON, nullable=False)
-    steps = db.Column(db.JSON, nullable=False)  # Array of steps showing algorithm progression
+    steps = db.Column(db.JSON, nullable=False)  # Delta trace (see trace.py); older rows hold a list of full-array steps
     complexity_time = db.Column(db.String(50))
     complexity_space = db.Column(db.String(50))
     created_at = db.Column(db.DateTime, default=db.func.now())
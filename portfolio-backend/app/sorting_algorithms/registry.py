@@ -0,0 +1,109 @@
+from app.sorting_algorithms import counters
+from app.sorting_algorithms.utils import (
+    bubble_sort_gen, selection_sort_gen, insertion_sort_gen, quick_sort_gen, merge_sort_gen,
+    heap_sort_gen, shell_sort_gen, counting_sort_gen, radix_sort_gen, tim_sort_gen
+)
+from app.sorting_algorithms.vectorized import VECTORIZED, sort_vectorized
+
+# Counting sort allocates one counter per value between min and max
+COUNTING_SORT_MAX_RANGE = 1_000_000
+
+# Largest input the pure-Python counters take when NumPy cannot count it
+# (about two seconds each); counting and radix sort are linear and have no cap
+QUADRATIC_MAX_COUNT_SIZE = 5_000
+SUBQUADRATIC_MAX_COUNT_SIZE = 200_000
+
+
+class SortAlgorithm:
+    """
+    One entry of the registry the /api/sorting-algorithms routes dispatch on.
+
+    step_generator(array, keyframe_interval) sorts array in place and yields
+    delta steps (see utils.py); counter(array) sorts it in place and only
+    returns operation counts (see counters.py). validate(array) returns an
+    error message for input the algorithm cannot sort, or None.
+    max_count_size caps the input of counter(array), or None for no cap.
+    """
+
+    def __init__(self, slug, name, step_generator, counter, time, space, stable,
+                 integers_only=False, max_range=None, max_count_size=None):
+        self.slug = slug
+        self.name = name
+        self.step_generator = step_generator
+        self.counter = counter
+        self.time = time
+        self.space = space
+        self.stable = stable
+        self.integers_only = integers_only
+        self.max_range = max_range
+        self.max_count_size = max_count_size
+
+    def validate(self, array):
+        if self.integers_only and not all(isinstance(v, int) and not isinstance(v, bool) for v in array):
+            return f'{self.slug} only sorts integers'
+        if self.max_range and array and max(array) - min(array) >= self.max_range:
+            return f'{self.slug} needs max - min below {self.max_range}'
+        return None
+
+    def over_count_size(self, array):
+        return self.max_count_size is not None and len(array) > self.max_count_size
+
+    def fast_path(self, array, numpy_min_size):
+        """
+        (sorted copy, counts, backend): on NumPy for large numeric arrays where
+        it applies, else the counter; None if the array is over max_count_size
+        and NumPy cannot count it.
+        """
+        if len(array) >= numpy_min_size or self.over_count_size(array):
+            result = sort_vectorized(self.slug, array)
+            if result is not None:
+                return result[0], result[1], 'numpy'
+        if self.over_count_size(array):
+            return None
+        output = list(array)
+        return output, self.counter(output), 'python'
+
+    def to_dict(self):
+        return {
+            'slug': self.slug,
+            'name': self.name,
+            'complexity': {'time': self.time, 'space': self.space},
+            'stable': self.stable,
+            'integers_only': self.integers_only,
+            'vectorized': self.slug in VECTORIZED,
+            'max_count_size': self.max_count_size
+        }
+
+
+ALGORITHMS = {}
+
+
+def register(algorithm):
+    ALGORITHMS[algorithm.slug] = algorithm
+    return algorithm
+
+
+def get_algorithm(slug):
+    return ALGORITHMS.get(slug)
+
+
+register(SortAlgorithm('bubble-sort', 'bubble_sort', bubble_sort_gen, counters.bubble_sort_count,
+                       'O(n²)', 'O(1)', stable=True, max_count_size=QUADRATIC_MAX_COUNT_SIZE))
+register(SortAlgorithm('selection-sort', 'selection_sort', selection_sort_gen, counters.selection_sort_count,
+                       'O(n²)', 'O(1)', stable=False, max_count_size=QUADRATIC_MAX_COUNT_SIZE))
+register(SortAlgorithm('insertion-sort', 'insertion_sort', insertion_sort_gen, counters.insertion_sort_count,
+                       'O(n²)', 'O(1)', stable=True, max_count_size=QUADRATIC_MAX_COUNT_SIZE))
+register(SortAlgorithm('quick-sort', 'quick_sort', quick_sort_gen, counters.quick_sort_count,
+                       'O(n log n)', 'O(log n)', stable=False, max_count_size=SUBQUADRATIC_MAX_COUNT_SIZE))
+register(SortAlgorithm('merge-sort', 'merge_sort', merge_sort_gen, counters.merge_sort_count,
+                       'O(n log n)', 'O(n)', stable=True, max_count_size=SUBQUADRATIC_MAX_COUNT_SIZE))
+register(SortAlgorithm('heap-sort', 'heap_sort', heap_sort_gen, counters.heap_sort_count,
+                       'O(n log n)', 'O(1)', stable=False, max_count_size=SUBQUADRATIC_MAX_COUNT_SIZE))
+register(SortAlgorithm('shell-sort', 'shell_sort', shell_sort_gen, counters.shell_sort_count,
+                       'O(n^1.5)', 'O(1)', stable=False, max_count_size=SUBQUADRATIC_MAX_COUNT_SIZE))
+register(SortAlgorithm('counting-sort', 'counting_sort', counting_sort_gen, counters.counting_sort_count,
+                       'O(n + k)', 'O(n + k)', stable=True, integers_only=True, max_range=COUNTING_SORT_MAX_RANGE))
+register(SortAlgorithm('radix-sort', 'radix_sort', radix_sort_gen, counters.radix_sort_count,
+                       'O(d·(n + b))', 'O(n + b)', stable=True, integers_only=True))
+register(SortAlgorithm('timsort', 'timsort', tim_sort_gen, counters.tim_sort_count,
+                       'O(n log n)', 'O(n)', stable=True, max_count_size=SUBQUADRATIC_MAX_COUNT_SIZE))
@@ -1,199 +1,231 @@
-from flask import Blueprint, request, jsonify
+import json
+
+from flask import Blueprint, Response, current_app, request, jsonify
 from app import db
 from app.sorting_algorithms.models import SortingAlgorithmOperation
-from app.sorting_algorithms.utils import bubble_sort_steps, selection_sort_steps, insertion_sort_steps, quick_sort_steps, merge_sort_steps
+from app.sorting_algorithms.trace import PASS_END, SAMPLE_MODES, expand, full_step, is_delta, replay
+from app.sorting_algorithms.registry import ALGORITHMS, get_algorithm
+from app.sorting_algorithms.utils import collect_trace
 
-sorting_bp = Blueprint('sorting', __name__, url_prefix='/sorting-algorithms')
+sorting_bp = Blueprint('sorting', __name__)
 
+TRACE_FORMATS = ('delta', 'full')
+TRACE_MODES = ('steps', 'none')
+STREAM_FORMATS = ('ndjson', 'sse')
 
-@sorting_bp.route('/bubble-sort', methods=['POST'])
-def bubble_sort():
-    """Execute bubble sort and return steps."""
-    try:
-        data = request.get_json()
-        if not data or 'array' not in data:
-            return jsonify({'error': 'Missing array in request'}), 400
-        
-        input_array = data['array']
-        if not isinstance(input_array, list):
-            return jsonify({'error': 'Array must be a list'}), 400
-        
-        output_array, steps = bubble_sort_steps(input_array)
-        
-        # Save to database
-        operation = SortingAlgorithmOperation(
-            algorithm_name='bubble_sort',
-            input_array=input_array,
-            output_array=output_array,
-            steps=steps,
-            complexity_time='O(n²)',
-            complexity_space='O(1)'
-        )
-        db.session.add(operation)
-        db.session.commit()
-        
-        return jsonify({
-            'id': operation.id,
-            'algorithm': 'bubble_sort',
-            'input': input_array,
-            'output': output_array,
-            'steps': steps,
-            'complexity': {'time': 'O(n²)', 'space': 'O(1)'}
-        }), 201
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+# Steps written per chunk of a streamed response after the first one, which
+# goes out alone so the client sees it as soon as the sort starts
+STREAM_CHUNK_STEPS = 64
 
 
-@sorting_bp.route('/selection-sort', methods=['POST'])
-def selection_sort():
-    """Execute selection sort and return steps."""
-    try:
-        data = request.get_json()
-        if not data or 'array' not in data:
-            return jsonify({'error': 'Missing array in request'}), 400
-        
-        input_array = data['array']
-        if not isinstance(input_array, list):
-            return jsonify({'error': 'Array must be a list'}), 400
-        
-        output_array, steps = selection_sort_steps(input_array)
-        
-        # Save to database
-        operation = SortingAlgorithmOperation(
-            algorithm_name='selection_sort',
-            input_array=input_array,
-            output_array=output_array,
-            steps=steps,
-            complexity_time='O(n²)',
-            complexity_space='O(1)'
-        )
-        db.session.add(operation)
-        db.session.commit()
-        
-        return jsonify({
-            'id': operation.id,
-            'algorithm': 'selection_sort',
-            'input': input_array,
-            'output': output_array,
-            'steps': steps,
-            'complexity': {'time': 'O(n²)', 'space': 'O(1)'}
-        }), 201
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+def parse_trace_options(data):
+    """
+    Read the optional trace settings from a sort request. Returns (options, error).
+    trace: 'steps' (default) or 'none' for the output and operation counts only.
+    format: 'delta' (default, see trace.py) or 'full' (a copy of the array per step).
+    keyframe_interval: with 'delta', include the whole array every N steps.
+    sample: 'uniform', 'swaps' or 'passes', which steps a sampled trace keeps.
+    max_steps: the most steps to keep; capped by SORT_MAX_STEPS, which is also the default.
+    """
+    trace_mode = data.get('trace', 'steps')
+    if trace_mode not in TRACE_MODES:
+        return None, f"trace must be one of: {', '.join(TRACE_MODES)}"
+    trace_format = data.get('format', 'delta')
+    if trace_format not in TRACE_FORMATS:
+        return None, f"format must be one of: {', '.join(TRACE_FORMATS)}"
+    keyframe_interval = data.get('keyframe_interval')
+    if keyframe_interval is not None and (
+            isinstance(keyframe_interval, bool) or not isinstance(keyframe_interval, int) or keyframe_interval < 1):
+        return None, 'keyframe_interval must be a positive integer'
+    sample = data.get('sample')
+    if sample is not None and sample not in SAMPLE_MODES:
+        return None, f"sample must be one of: {', '.join(SAMPLE_MODES)}"
+    max_steps = data.get('max_steps')
+    if max_steps is not None and (isinstance(max_steps, bool) or not isinstance(max_steps, int) or max_steps < 2):
+        return None, 'max_steps must be an integer of at least 2'
+    limit = current_app.config['SORT_MAX_STEPS']
+    if limit and max_steps is not None and max_steps > limit:
+        return None, f'max_steps must be at most {limit}'
+    return {
+        'trace': trace_mode,
+        'format': trace_format,
+        'keyframe_interval': keyframe_interval,
+        'sample': sample,
+        'max_steps': max_steps
+    }, None
 
 
-@sorting_bp.route('/insertion-sort', methods=['POST'])
-def insertion_sort():
-    """Execute insertion sort and return steps."""
-    try:
-        data = request.get_json()
-        if not data or 'array' not in data:
-            return jsonify({'error': 'Missing array in request'}), 400
-        
-        input_array = data['array']
-        if not isinstance(input_array, list):
-            return jsonify({'error': 'Array must be a list'}), 400
-        
-        output_array, steps = insertion_sort_steps(input_array)
-        
-        # Save to database
-        operation = SortingAlgorithmOperation(
-            algorithm_name='insertion_sort',
-            input_array=input_array,
-            output_array=output_array,
-            steps=steps,
-            complexity_time='O(n²)',
-            complexity_space='O(1)'
-        )
-        db.session.add(operation)
-        db.session.commit()
-        
-        return jsonify({
-            'id': operation.id,
-            'algorithm': 'insertion_sort',
-            'input': input_array,
-            'output': output_array,
-            'steps': steps,
-            'complexity': {'time': 'O(n²)', 'space': 'O(1)'}
-        }), 201
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+def response_steps(trace, options):
+    return expand(trace) if options['format'] == 'full' else trace
+
+
+def parse_sort_request(algorithm):
+    """Validate a sort request body once for every algorithm. Returns (input_array, options, error)."""
+    data = request.get_json(silent=True)
+    if not data or 'array' not in data:
+        return None, None, 'Missing array in request'
+    
+    input_array = data['array']
+    if not isinstance(input_array, list):
+        return None, None, 'Array must be a list'
+    
+    error = algorithm.validate(input_array)
+    if error:
+        return None, None, error
+    
+    options, error = parse_trace_options(data)
+    return input_array, options, error
 
 
-@sorting_bp.route('/quick-sort', methods=['POST'])
-def quick_sort():
-    """Execute quick sort and return steps."""
+@sorting_bp.route('/algorithms', methods=['GET'])
+def list_algorithms():
+    """The registered algorithms and their metadata."""
+    return jsonify([algorithm.to_dict() for algorithm in ALGORITHMS.values()]), 200
+
+
+@sorting_bp.route('/<slug>', methods=['POST'])
+def run_sort(slug):
+    """
+    Execute any registered algorithm and return its steps. With
+    "trace": "none" no steps are recorded: the output and operation counts
+    come from the algorithm's fast path (NumPy for large numeric arrays
+    where available) and nothing is stored.
+    """
+    algorithm = get_algorithm(slug)
+    if not algorithm:
+        return jsonify({'error': f'Unknown algorithm: {slug}'}), 404
+    
     try:
-        data = request.get_json()
-        if not data or 'array' not in data:
-            return jsonify({'error': 'Missing array in request'}), 400
+        input_array, options, error = parse_sort_request(algorithm)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        result = {
+            'algorithm': algorithm.name,
+            'input': input_array,
+            'complexity': {'time': algorithm.time, 'space': algorithm.space}
+        }
         
-        input_array = data['array']
-        if not isinstance(input_array, list):
-            return jsonify({'error': 'Array must be a list'}), 400
+        if options['trace'] == 'none':
+            fast = algorithm.fast_path(input_array, current_app.config['SORT_NUMPY_MIN_SIZE'])
+            if fast is None:
+                return jsonify({'error': f'{algorithm.slug} counts at most {algorithm.max_count_size} numbers'}), 400
+            output_array, counts, backend = fast
+            result.update({'output': output_array, 'counts': counts, 'backend': backend})
+            return jsonify(result), 200
         
-        output_array, steps = quick_sort_steps(input_array)
+        output_array, steps = collect_trace(
+            algorithm.step_generator, input_array, options['keyframe_interval'],
+            sample=options['sample'], max_steps=options['max_steps'] or current_app.config['SORT_MAX_STEPS'] or None)
         
         # Save to database
         operation = SortingAlgorithmOperation(
-            algorithm_name='quick_sort',
+            algorithm_name=algorithm.name,
             input_array=input_array,
             output_array=output_array,
             steps=steps,
-            complexity_time='O(n log n)',
-            complexity_space='O(log n)'
+            complexity_time=algorithm.time,
+            complexity_space=algorithm.space
         )
         db.session.add(operation)
         db.session.commit()
         
-        return jsonify({
-            'id': operation.id,
-            'algorithm': 'quick_sort',
-            'input': input_array,
-            'output': output_array,
-            'steps': steps,
-            'complexity': {'time': 'O(n log n)', 'space': 'O(log n)'}
-        }), 201
+        result.update({'id': operation.id, 'output': output_array, 'steps': response_steps(steps, options)})
+        return jsonify(result), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@sorting_bp.route('/merge-sort', methods=['POST'])
-def merge_sort():
-    """Execute merge sort and return steps."""
+def sort_events(algorithm, input_array, options):
+    """
+    The events of a streamed sort: 'start', one per step as the generator
+    produces it, then 'done'. Only the array being sorted is held, never the
+    steps, so memory stays O(n) however many steps the algorithm takes.
+    The status line has gone out by the time the sort runs, so a failure
+    (e.g. values that cannot be compared) ends the stream with an 'error'
+    event instead of 'done'.
+    """
+    yield 'start', {
+        'algorithm': algorithm.name,
+        'input': input_array,
+        'format': options['format'],
+        'keyframe_interval': options['keyframe_interval']
+    }
+    array = input_array.copy()
+    count = 0
     try:
-        data = request.get_json()
-        if not data or 'array' not in data:
-            return jsonify({'error': 'Missing array in request'}), 400
-        
-        input_array = data['array']
-        if not isinstance(input_array, list):
-            return jsonify({'error': 'Array must be a list'}), 400
-        
-        output_array, steps = merge_sort_steps(input_array)
-        
-        # Save to database
-        operation = SortingAlgorithmOperation(
-            algorithm_name='merge_sort',
-            input_array=input_array,
-            output_array=output_array,
-            steps=steps,
-            complexity_time='O(n log n)',
-            complexity_space='O(n)'
-        )
-        db.session.add(operation)
-        db.session.commit()
-        
-        return jsonify({
-            'id': operation.id,
-            'algorithm': 'merge_sort',
-            'input': input_array,
-            'output': output_array,
-            'steps': steps,
-            'complexity': {'time': 'O(n log n)', 'space': 'O(n)'}
-        }), 201
+        for step in algorithm.step_generator(array, options['keyframe_interval']):
+            if step is PASS_END:
+                continue
+            if options['format'] == 'full':
+                step = full_step(step, array)
+            count += 1
+            yield 'step', step
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        yield 'error', {'error': str(e), 'total_steps': count}
+        return
+    yield 'done', {'output': array, 'total_steps': count}
+
+
+def encode_ndjson(event, value):
+    if event != 'step':
+        value = {'event': event, **value}
+    return json.dumps(value) + '\n'
+
+
+def encode_sse(event, value):
+    return f'event: {event}\ndata: {json.dumps(value)}\n\n'
+
+
+def chunked(lines, size):
+    """Join lines into chunks of up to `size`, sending the first line on its own"""
+    lines = iter(lines)
+    for line in lines:
+        yield line
+        break
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+@sorting_bp.route('/<slug>/stream', methods=['POST'])
+def stream_sort(slug):
+    """
+    Run a sort and stream its steps while it runs, as NDJSON (default) or
+    Server-Sent Events (?stream=sse or Accept: text/event-stream). The body is
+    produced lazily and the server only pulls the next chunk once the
+    previous one has been written, so a slow client pauses the sort instead
+    of buffering its steps. Streamed runs are not saved to history.
+    """
+    algorithm = get_algorithm(slug)
+    if not algorithm:
+        return jsonify({'error': f'Unknown algorithm: {slug}'}), 404
+    
+    input_array, options, error = parse_sort_request(algorithm)
+    if error:
+        return jsonify({'error': error}), 400
+    if options['trace'] == 'none':
+        return jsonify({'error': 'trace must not be none when streaming steps'}), 400
+    if options['sample'] or options['max_steps']:
+        return jsonify({'error': 'sample and max_steps apply to stored traces, not streams'}), 400
+    
+    stream_format = request.args.get('stream')
+    if stream_format is None:
+        stream_format = 'sse' if request.accept_mimetypes.best == 'text/event-stream' else 'ndjson'
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({'error': f"stream must be one of: {', '.join(STREAM_FORMATS)}"}), 400
+    
+    encode, mimetype = (encode_sse, 'text/event-stream') if stream_format == 'sse' else (encode_ndjson, 'application/x-ndjson')
+    lines = (encode(event, value) for event, value in sort_events(algorithm, input_array, options))
+    return Response(chunked(lines, STREAM_CHUNK_STEPS), mimetype=mimetype, headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # keep nginx from buffering the stream
+    })
 
 
 @sorting_bp.route('/history', methods=['GET'])
@@ -208,11 +240,45 @@ def get_history():
 
 @sorting_bp.route('/<int:op_id>', methods=['GET'])
 def get_operation(op_id):
-    """Get a specific sorting operation by ID."""
+    """Get a specific sorting operation by ID (?format=full expands a delta trace)."""
     try:
         operation = SortingAlgorithmOperation.query.get(op_id)
         if not operation:
             return jsonify({'error': 'Operation not found'}), 404
-        return jsonify(operation.to_dict()), 200
+        result = operation.to_dict()
+        if request.args.get('format') == 'full' and is_delta(operation.steps):
+            result['steps'] = expand(operation.steps)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@sorting_bp.route('/<int:op_id>/steps/<int:step>', methods=['GET'])
+def get_operation_step(op_id, step):
+    """Reconstruct the array right after one step of a stored operation."""
+    try:
+        operation = SortingAlgorithmOperation.query.get(op_id)
+        if not operation:
+            return jsonify({'error': 'Operation not found'}), 404
+        
+        steps = operation.steps
+        count = len(steps['steps']) if is_delta(steps) else len(steps)
+        if step >= count:
+            return jsonify({'error': f'Step out of range (operation has {count} steps)'}), 404
+        
+        if is_delta(steps):
+            recorded = steps['steps'][step]
+            array = replay(steps, step)
+        else:
+            recorded = steps[step]
+            array = recorded['array']
+        return jsonify({
+            'id': operation.id,
+            'step': step,
+            'total_steps': count,
+            'type': recorded['type'],
+            'indices': recorded.get('indices'),
+            'array': array
+        }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,288 @@
+"""
+Delta-encoded sorting traces.
+
+Instead of a full copy of the array per step, a trace stores the input
+once and each step only as what it did:
+
+    {'type': 'compare', 'indices': [3, 4]}
+    {'type': 'swap', 'indices': [3, 4], 'set': [[3, 7], [4, 9]]}
+
+'set' lists the [index, value] writes made by the step, so the array after
+step s is the input with the writes of steps 0..s applied in order. With a
+keyframe_interval K, every K-th step also carries the whole 'array', which
+bounds a replay to at most K - 1 steps of writes.
+
+A sampled trace (see StepSampler) keeps only some steps. Each kept step
+also carries the writes of the steps dropped before it, so replay is still
+exact. It records where it was in the full run as 'at', and the trace
+gets a 'sample' entry with the mode, the budget and the full step count.
+"""
+
+FORMAT = 'delta'
+SAMPLE_MODES = ('uniform', 'swaps', 'passes')
+
+# Steps that only read the array, dropped by the 'swaps' sample mode
+READ_ONLY_TYPES = ('compare', 'count')
+
+# Values (writes and keyframe elements) a budgeted StepSampler stores per
+# kept step on average, so keyframes of long arrays count against max_steps
+VALUES_PER_STEP = 16
+
+# Yielded by the *_sort_gen generators between the steps of two passes
+# (an outer-loop iteration, a partition, a merge...); never part of a trace
+PASS_END = object()
+
+
+class StepRecorder:
+    """Builds the delta steps yielded by the *_sort_gen generators in utils.py"""
+
+    def __init__(self, keyframe_interval=None):
+        self.keyframe_interval = keyframe_interval
+        self.count = 0
+        self._pending = {}
+
+    def step(self, step_type, array, indices=None, changed=()):
+        """A new step; `changed` are the indices it wrote, read back from array"""
+        step = {'type': step_type}
+        if indices is not None:
+            step['indices'] = list(indices)
+        writes, self._pending = self._pending, {}
+        for index in changed:
+            writes[index] = array[index]
+        if writes:
+            step['set'] = [[index, value] for index, value in writes.items()]
+        self.count += 1
+        if self.keyframe_interval and self.count % self.keyframe_interval == 0:
+            step['array'] = list(array)
+        return step
+
+    def write(self, array, index):
+        """A write with no step of its own; it is folded into the next step"""
+        self._pending[index] = array[index]
+
+    def flush(self, array):
+        """
+        A final 'write' step for writes still waiting for a next step, so the
+        last step replays to the sorted array; None if there are none, or if
+        nothing was recorded (the writes then only put values back in place).
+        """
+        if not self._pending or not self.count:
+            return None
+        return self.step('write', array, list(self._pending))
+
+
+class StepSampler:
+    """
+    Keeps at most max_steps of the steps of a run, choosing them on the fly.
+
+    mode picks the steps that may be kept: 'uniform' (all of them), 'swaps'
+    (steps that write) or 'passes' (the last step of each pass). Every
+    eligible step on the current stride is kept; whenever the budget
+    overflows, the stride doubles and every other kept step is dropped. A
+    kept step whose folded-in writes would outgrow an eighth of the array
+    becomes a keyframe instead. Besides max_steps, the budget caps the
+    values stored in writes and keyframes at VALUES_PER_STEP per step (and
+    at least 64 arrays), so memory stays linear in max_steps and the
+    array length however long the run is. The last step is always kept,
+    with the final array.
+
+    `array` is the list being sorted, seen before the first step. Keyframes
+    are rebuilt from the steps' writes rather than copied from it, since a
+    generator may already have made writes for its next step (see
+    StepRecorder.write) by the time a 'passes' step is kept.
+    """
+
+    def __init__(self, array, mode='uniform', max_steps=None):
+        self.mode = mode
+        self.max_steps = max_steps
+        self.total = 0
+        self._initial = list(array)
+        self._state = list(array)  # the array after the last step added
+        self._max_writes = max(len(array) // 8, 16)
+        self._max_values = max_steps and max(max_steps * VALUES_PER_STEP, 64 * len(array))
+        self._values = 0
+        self._kept = []  # [eligible counter, index in the full run, step]
+        self._pending = {}
+        self._rebase = False  # a dropped keyframe: the next kept step needs one too
+        self._stride = 1
+        self._eligible = 0
+        self._dropped = False
+        self._last = None
+        self._candidate = None
+
+    def add(self, step):
+        self._last = step
+        for index, value in step.get('set', ()):
+            self._state[index] = value
+        at = self.total
+        self.total += 1
+        if self.mode == 'passes':
+            if self._candidate is not None:
+                self._drop(self._candidate[1])
+            self._candidate = (at, step)
+        elif self.mode == 'swaps' and step['type'] in READ_ONLY_TYPES:
+            self._drop(step)
+        else:
+            self._offer(at, step)
+
+    def pass_end(self):
+        if self._candidate is not None:
+            at, step = self._candidate
+            self._candidate = None
+            self._offer(at, step)
+
+    def finish(self):
+        """The kept steps, in order"""
+        last = self._last
+        if last is None:
+            return []
+        if self._candidate is not None:
+            self._drop(self._candidate[1])
+        if not self._kept or self._kept[-1][2] is not last:
+            # Make room for the last step only now, so a run that fits is not sampled
+            while self.max_steps and len(self._kept) >= self.max_steps:
+                self._compact()
+            self._kept.append([None, self.total - 1, self._claim(last)])
+        if self._dropped:
+            last['array'] = list(self._state)
+            for _, at, step in self._kept:
+                step['at'] = at
+        return [step for _, _, step in self._kept]
+
+    def sample_info(self):
+        """The trace's 'sample' entry, or None if every step was kept"""
+        if not self._dropped:
+            return None
+        return {'mode': self.mode, 'max_steps': self.max_steps, 'total_steps': self.total}
+
+    def _drop(self, step):
+        self._dropped = True
+        for index, value in step.get('set', ()):
+            self._pending[index] = value
+
+    def _claim(self, step):
+        """Give step the writes of the steps dropped since the last kept one"""
+        if 'array' not in step and (self._pending or self._rebase):
+            for index, value in step.get('set', ()):
+                self._pending[index] = value
+            if self._rebase or len(self._pending) > self._max_writes:
+                step['array'] = list(self._state)
+            else:
+                step['set'] = [[index, value] for index, value in self._pending.items()]
+        self._pending = {}
+        self._rebase = False
+        return step
+
+    def _offer(self, at, step):
+        counter = self._eligible
+        self._eligible += 1
+        if counter % self._stride:
+            self._drop(step)
+            return
+        self._kept.append([counter, at, self._claim(step)])
+        self._values += _stored_values(step)
+        while self.max_steps and (len(self._kept) > self.max_steps or self._values > self._max_values) \
+                and len(self._kept) > 1:
+            self._compact()
+
+    def _compact(self):
+        """Double the stride, replaying the kept steps to fold each dropped one into the next survivor"""
+        self._stride *= 2
+        self._dropped = True
+        state = list(self._initial)
+        kept, carry, rebase, values = [], {}, False, 0
+        for entry in self._kept:
+            step = entry[2]
+            if 'array' in step:
+                state = list(step['array'])
+                carry, rebase = {}, True
+            else:
+                for index, value in step.get('set', ()):
+                    state[index] = value
+                    carry[index] = value
+            if entry[0] % self._stride:
+                continue
+            if 'array' not in step and (rebase or len(carry) > len(step.get('set', ()))):
+                if rebase or len(carry) > self._max_writes:
+                    step['array'] = list(state)
+                else:
+                    step['set'] = [[index, value] for index, value in carry.items()]
+            carry, rebase = {}, False
+            kept.append(entry)
+            values += _stored_values(step)
+        if carry or rebase:
+            carry.update(self._pending)
+            self._pending = carry
+            self._rebase = self._rebase or rebase
+        self._kept = kept
+        self._values = values
+
+
+def _stored_values(step):
+    """How many values a step stores: two per write, plus its keyframe"""
+    return 2 * len(step.get('set', ())) + len(step.get('array', ()))
+
+
+def make_trace(initial, steps, keyframe_interval=None, sample=None):
+    trace = {
+        'format': FORMAT,
+        'initial': list(initial),
+        'keyframe_interval': keyframe_interval,
+        'steps': steps
+    }
+    if sample:
+        trace['sample'] = sample
+    return trace
+
+
+def is_delta(steps):
+    """True for a delta trace, False for the legacy list of full-array steps"""
+    return isinstance(steps, dict) and steps.get('format') == FORMAT
+
+
+def replay(trace, step_index):
+    """The array right after step `step_index` (negative counts from the end)"""
+    steps = trace['steps']
+    if step_index < 0:
+        step_index += len(steps)
+    if not 0 <= step_index < len(steps):
+        raise IndexError(f'step {step_index} out of range (trace has {len(steps)} steps)')
+
+    # Start from the nearest keyframe at or before the step
+    start, array = 0, None
+    for keyframe in range(step_index, -1, -1):
+        if 'array' in steps[keyframe]:
+            start, array = keyframe + 1, list(steps[keyframe]['array'])
+            break
+    if array is None:
+        array = list(trace['initial'])
+
+    for step in steps[start:step_index + 1]:
+        for index, value in step.get('set', ()):
+            array[index] = value
+    return array
+
+
+def iter_arrays(trace):
+    """Yield (step, array after it) for every step, replaying incrementally"""
+    array = list(trace['initial'])
+    for step in trace['steps']:
+        for index, value in step.get('set', ()):
+            array[index] = value
+        if 'array' in step:
+            array = list(step['array'])
+        yield step, array
+
+
+def full_step(step, array):
+    """A step in the legacy format, with a copy of the array after it"""
+    full = {'type': step['type']}
+    if 'indices' in step:
+        full['indices'] = step['indices']
+    full['array'] = array.copy()
+    return full
+
+
+def expand(trace):
+    """The legacy format: every step with a full copy of the array"""
+    return [full_step(step, array) for step, array in iter_arrays(trace)]
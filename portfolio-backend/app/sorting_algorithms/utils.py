@@ -1,186 +1,370 @@
-def bubble_sort_steps(arr):
+from app.sorting_algorithms.trace import PASS_END, StepRecorder, StepSampler, expand, make_trace
+
+RADIX_BASE = 10
+
+# Each *_sort_gen sorts `array` in place and yields delta steps (see
+# trace.py) as it goes, so a caller can stream them without holding them
+# all, with PASS_END between passes; *_sort_trace collects them into a trace.
+
+
+def bubble_sort_gen(array, keyframe_interval=None):
     """
     Generate step-by-step visualization for bubble sort.
-    Returns the sorted array and list of steps.
     """
-    steps = []
-    array = arr.copy()
+    recorder = StepRecorder(keyframe_interval)
     n = len(array)
-    
+
     for i in range(n):
         for j in range(0, n - i - 1):
             # Record comparison
-            steps.append({
-                'type': 'compare',
-                'indices': [j, j + 1],
-                'array': array.copy()
-            })
-            
+            yield recorder.step('compare', array, [j, j + 1])
+
             if array[j] > array[j + 1]:
                 array[j], array[j + 1] = array[j + 1], array[j]
-                steps.append({
-                    'type': 'swap',
-                    'indices': [j, j + 1],
-                    'array': array.copy()
-                })
-    
-    return array, steps
+                yield recorder.step('swap', array, [j, j + 1], changed=(j, j + 1))
+        yield PASS_END
 
 
-def selection_sort_steps(arr):
+def selection_sort_gen(array, keyframe_interval=None):
     """
     Generate step-by-step visualization for selection sort.
     """
-    steps = []
-    array = arr.copy()
+    recorder = StepRecorder(keyframe_interval)
     n = len(array)
-    
+
     for i in range(n):
         min_idx = i
         for j in range(i + 1, n):
             # Record comparison
-            steps.append({
-                'type': 'compare',
-                'indices': [j, min_idx],
-                'array': array.copy()
-            })
-            
+            yield recorder.step('compare', array, [j, min_idx])
+
             if array[j] < array[min_idx]:
                 min_idx = j
-        
+
         if min_idx != i:
             array[i], array[min_idx] = array[min_idx], array[i]
-            steps.append({
-                'type': 'swap',
-                'indices': [i, min_idx],
-                'array': array.copy()
-            })
-    
-    return array, steps
+            yield recorder.step('swap', array, [i, min_idx], changed=(i, min_idx))
+        yield PASS_END
 
 
-def insertion_sort_steps(arr):
+def _insertion_steps(array, recorder, lo, hi, gap=1, key_passes=False):
+    """Insertion sort of array[lo:hi], comparing elements `gap` apart; key_passes ends a pass per key"""
+    for i in range(lo + gap, hi):
+        key = array[i]
+        j = i - gap
+
+        while j >= lo and array[j] > key:
+            # Record comparison
+            yield recorder.step('compare', array, [j, i])
+
+            array[j + gap] = array[j]
+            yield recorder.step('swap', array, [j, j + gap], changed=(j + gap,))
+            j -= gap
+
+        array[j + gap] = key
+        # Placing the key is not a step of its own; it shows up with the next one
+        recorder.write(array, j + gap)
+        if key_passes:
+            yield PASS_END
+
+
+def _flush(recorder, array):
+    """Yield the recorder's final write step, if it has one"""
+    step = recorder.flush(array)
+    if step is not None:
+        yield step
+
+
+def _merge_steps(array, recorder, left, mid, right):
+    """Merge the sorted runs array[left:mid + 1] and array[mid + 1:right + 1]"""
+    left_arr = array[left:mid + 1]
+    right_arr = array[mid + 1:right + 1]
+
+    i = j = 0
+    k = left
+
+    while i < len(left_arr) and j < len(right_arr):
+        if left_arr[i] <= right_arr[j]:
+            array[k] = left_arr[i]
+            i += 1
+        else:
+            array[k] = right_arr[j]
+            j += 1
+        yield recorder.step('merge', array, changed=(k,))
+        k += 1
+
+    while i < len(left_arr):
+        array[k] = left_arr[i]
+        i += 1
+        yield recorder.step('merge', array, changed=(k,))
+        k += 1
+
+    while j < len(right_arr):
+        array[k] = right_arr[j]
+        j += 1
+        yield recorder.step('merge', array, changed=(k,))
+        k += 1
+
+
+def insertion_sort_gen(array, keyframe_interval=None):
     """
     Generate step-by-step visualization for insertion sort.
     """
-    steps = []
-    array = arr.copy()
-    
-    for i in range(1, len(array)):
-        key = array[i]
-        j = i - 1
-        
-        while j >= 0 and array[j] > key:
-            # Record comparison
-            steps.append({
-                'type': 'compare',
-                'indices': [j, i],
-                'array': array.copy()
-            })
-            
-            array[j + 1] = array[j]
-            steps.append({
-                'type': 'swap',
-                'indices': [j, j + 1],
-                'array': array.copy()
-            })
-            j -= 1
-        
-        array[j + 1] = key
-    
-    return array, steps
+    recorder = StepRecorder(keyframe_interval)
+    yield from _insertion_steps(array, recorder, 0, len(array), key_passes=True)
+    yield from _flush(recorder, array)
 
 
-def quick_sort_steps(arr):
+def quick_sort_gen(array, keyframe_interval=None):
     """
     Generate step-by-step visualization for quick sort.
+    Uses an explicit stack (left part first) so sorted input cannot hit the recursion limit.
     """
-    steps = []
-    
-    def quicksort(array, low, high):
-        if low < high:
-            pi = partition(array, low, high)
-            quicksort(array, low, pi - 1)
-            quicksort(array, pi + 1, high)
-    
-    def partition(array, low, high):
+    recorder = StepRecorder(keyframe_interval)
+
+    def partition(low, high):
         pivot = array[high]
         i = low - 1
-        
+
         for j in range(low, high):
             if array[j] < pivot:
                 i += 1
                 array[i], array[j] = array[j], array[i]
-                steps.append({
-                    'type': 'swap',
-                    'indices': [i, j],
-                    'array': array.copy()
-                })
-        
+                yield recorder.step('swap', array, [i, j], changed=(i, j))
+
         array[i + 1], array[high] = array[high], array[i + 1]
-        steps.append({
-            'type': 'swap',
-            'indices': [i + 1, high],
-            'array': array.copy()
-        })
+        yield recorder.step('swap', array, [i + 1, high], changed=(i + 1, high))
         return i + 1
-    
-    array = arr.copy()
-    quicksort(array, 0, len(array) - 1)
-    return array, steps
+
+    stack = [(0, len(array) - 1)]
+    while stack:
+        low, high = stack.pop()
+        if low < high:
+            pi = yield from partition(low, high)
+            yield PASS_END
+            stack.append((pi + 1, high))
+            stack.append((low, pi - 1))
 
 
-def merge_sort_steps(arr):
+def merge_sort_gen(array, keyframe_interval=None):
     """
     Generate step-by-step visualization for merge sort.
     """
-    steps = []
-    
-    def merge_sort(array, left, right):
+    recorder = StepRecorder(keyframe_interval)
+
+    def merge_sort(left, right):
         if left < right:
             mid = (left + right) // 2
-            merge_sort(array, left, mid)
-            merge_sort(array, mid + 1, right)
-            merge(array, left, mid, right)
-    
-    def merge(array, left, mid, right):
-        left_arr = array[left:mid + 1]
-        right_arr = array[mid + 1:right + 1]
-        
-        i = j = 0
-        k = left
-        
-        while i < len(left_arr) and j < len(right_arr):
-            if left_arr[i] <= right_arr[j]:
-                array[k] = left_arr[i]
-                i += 1
-            else:
-                array[k] = right_arr[j]
-                j += 1
-            k += 1
-            steps.append({
-                'type': 'merge',
-                'array': array.copy()
-            })
-        
-        while i < len(left_arr):
-            array[k] = left_arr[i]
-            i += 1
-            k += 1
-            steps.append({
-                'type': 'merge',
-                'array': array.copy()
-            })
-        
-        while j < len(right_arr):
-            array[k] = right_arr[j]
-            j += 1
+            yield from merge_sort(left, mid)
+            yield from merge_sort(mid + 1, right)
+            yield from _merge_steps(array, recorder, left, mid, right)
+            yield PASS_END
+
+    yield from merge_sort(0, len(array) - 1)
+
+
+def heap_sort_gen(array, keyframe_interval=None):
+    """
+    Generate step-by-step visualization for heap sort.
+    """
+    recorder = StepRecorder(keyframe_interval)
+    n = len(array)
+
+    def sift_down(root, end):
+        while True:
+            largest = root
+            for child in (2 * root + 1, 2 * root + 2):
+                if child < end:
+                    yield recorder.step('compare', array, [child, largest])
+                    if array[child] > array[largest]:
+                        largest = child
+            if largest == root:
+                return
+            array[root], array[largest] = array[largest], array[root]
+            yield recorder.step('swap', array, [root, largest], changed=(root, largest))
+            root = largest
+
+    for start in range(n // 2 - 1, -1, -1):
+        yield from sift_down(start, n)
+    yield PASS_END
+
+    for end in range(n - 1, 0, -1):
+        array[0], array[end] = array[end], array[0]
+        yield recorder.step('swap', array, [0, end], changed=(0, end))
+        yield from sift_down(0, end)
+        yield PASS_END
+
+
+def shell_sort_gen(array, keyframe_interval=None):
+    """
+    Generate step-by-step visualization for shell sort (Knuth's 1, 4, 13, 40, ... gaps).
+    """
+    recorder = StepRecorder(keyframe_interval)
+    n = len(array)
+
+    gap = 1
+    while gap < n // 3:
+        gap = 3 * gap + 1
+
+    while gap >= 1:
+        yield from _insertion_steps(array, recorder, 0, n, gap)
+        yield PASS_END
+        gap //= 3
+    yield from _flush(recorder, array)
+
+
+def counting_sort_gen(array, keyframe_interval=None):
+    """
+    Generate step-by-step visualization for counting sort (integers only).
+    """
+    recorder = StepRecorder(keyframe_interval)
+    if not array:
+        return
+
+    lo = min(array)
+    counts = [0] * (max(array) - lo + 1)
+    for i, value in enumerate(array):
+        counts[value - lo] += 1
+        yield recorder.step('count', array, [i])
+    yield PASS_END
+
+    k = 0
+    for offset, count in enumerate(counts):
+        for _ in range(count):
+            array[k] = offset + lo
+            yield recorder.step('write', array, [k], changed=(k,))
             k += 1
-            steps.append({
-                'type': 'merge',
-                'array': array.copy()
-            })
-    
+    yield PASS_END
+
+
+def radix_sort_gen(array, keyframe_interval=None):
+    """
+    Generate step-by-step visualization for LSD radix sort (integers only, base 10).
+    Digits are taken from value - min(array) so negative numbers sort too.
+    """
+    recorder = StepRecorder(keyframe_interval)
+    if not array:
+        return
+
+    lo = min(array)
+    largest = max(array) - lo
+    exp = 1
+    while True:
+        buckets = [[] for _ in range(RADIX_BASE)]
+        for i, value in enumerate(array):
+            buckets[(value - lo) // exp % RADIX_BASE].append(value)
+            yield recorder.step('count', array, [i])
+
+        k = 0
+        for bucket in buckets:
+            for value in bucket:
+                array[k] = value
+                yield recorder.step('write', array, [k], changed=(k,))
+                k += 1
+        yield PASS_END
+
+        exp *= RADIX_BASE
+        if largest // exp == 0:
+            break
+
+
+def _min_run(n):
+    """CPython's minrun: n divided down to below 64, rounded up if any bits were shifted out"""
+    extra = 0
+    while n >= 64:
+        extra |= n & 1
+        n >>= 1
+    return n + extra
+
+
+def tim_sort_gen(array, keyframe_interval=None):
+    """
+    Generate step-by-step visualization for a simplified timsort: insertion
+    sort over fixed minrun-sized runs, then bottom-up merges (no galloping).
+    """
+    recorder = StepRecorder(keyframe_interval)
+    n = len(array)
+    run = max(_min_run(n), 1)
+
+    for start in range(0, n, run):
+        yield from _insertion_steps(array, recorder, start, min(start + run, n))
+        yield PASS_END
+
+    size = run
+    while size < n:
+        for left in range(0, n, 2 * size):
+            mid = min(left + size - 1, n - 1)
+            right = min(left + 2 * size - 1, n - 1)
+            if mid < right:
+                yield from _merge_steps(array, recorder, left, mid, right)
+                yield PASS_END
+        size *= 2
+    yield from _flush(recorder, array)
+
+
+def collect_trace(sort_gen, arr, keyframe_interval=None, sample=None, max_steps=None):
+    """
+    Run a *_sort_gen on a copy of arr; returns the sorted array and the trace dict.
+    With a sample mode or max_steps the steps go through a StepSampler as they are made.
+    """
     array = arr.copy()
-    merge_sort(array, 0, len(array) - 1)
-    return array, steps
+    steps = sort_gen(array, keyframe_interval)
+    if sample is None and max_steps is None:
+        return array, make_trace(arr, [step for step in steps if step is not PASS_END], keyframe_interval)
+
+    sampler = StepSampler(array, sample or 'uniform', max_steps)
+    for step in steps:
+        if step is PASS_END:
+            sampler.pass_end()
+        else:
+            sampler.add(step)
+    kept = sampler.finish()
+    return array, make_trace(arr, kept, keyframe_interval, sampler.sample_info())
+
+
+def bubble_sort_trace(arr, keyframe_interval=None):
+    return collect_trace(bubble_sort_gen, arr, keyframe_interval)
+
+
+def selection_sort_trace(arr, keyframe_interval=None):
+    return collect_trace(selection_sort_gen, arr, keyframe_interval)
+
+
+def insertion_sort_trace(arr, keyframe_interval=None):
+    return collect_trace(insertion_sort_gen, arr, keyframe_interval)
+
+
+def quick_sort_trace(arr, keyframe_interval=None):
+    return collect_trace(quick_sort_gen, arr, keyframe_interval)
+
+
+def merge_sort_trace(arr, keyframe_interval=None):
+    return collect_trace(merge_sort_gen, arr, keyframe_interval)
+
+
+# Legacy format: every step carries a full copy of the array (O(n) per step)
+
+def bubble_sort_steps(arr):
+    array, trace = bubble_sort_trace(arr)
+    return array, expand(trace)
+
+
+def selection_sort_steps(arr):
+    array, trace = selection_sort_trace(arr)
+    return array, expand(trace)
+
+
+def insertion_sort_steps(arr):
+    array, trace = insertion_sort_trace(arr)
+    return array, expand(trace)
+
+
+def quick_sort_steps(arr):
+    array, trace = quick_sort_trace(arr)
+    return array, expand(trace)
+
+
+def merge_sort_steps(arr):
+    array, trace = merge_sort_trace(arr)
+    return array, expand(trace)
+
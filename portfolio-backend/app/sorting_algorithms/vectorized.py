@@ -0,0 +1,123 @@
+"""
+NumPy versions of the counter-only sorts in counters.py, for large numeric
+arrays. They return exactly the same output and counts without running the
+algorithm: the counts are derived from the input. For example, bubble sort
+makes n(n - 1)/2 comparisons and one swap per inversion. Only algorithms
+whose counts have such a closed form are here. NumPy is optional;
+VECTORIZED is empty without it.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+from app.sorting_algorithms.counters import new_counts
+from app.sorting_algorithms.utils import RADIX_BASE
+
+
+def as_numeric(array):
+    """The array as an int64 or float64 ndarray, or None if it is not all ints or all floats"""
+    kinds = {type(value) for value in array}
+    if kinds == {int}:
+        try:
+            return np.asarray(array, dtype=np.int64)
+        except OverflowError:
+            return None
+    if kinds == {float}:
+        return np.asarray(array, dtype=np.float64)
+    return None
+
+
+def inversions(values):
+    """
+    Pairs i < j with values[i] > values[j], in O(n log n) vectorized steps.
+
+    Values are replaced by dense ranks and placed one bit at a time from the
+    top, like an MSD radix sort. Before placing bit b, elements are grouped
+    by their higher bits and keep their original order within a group, so
+    every element with bit b set counts one inversion against each later
+    element of its group without it.
+    """
+    n = len(values)
+    if n < 2:
+        return 0
+    seq = np.unique(values, return_inverse=True)[1].ravel().astype(np.intp)
+    positions = np.arange(n)
+    total = 0
+
+    for b in reversed(range(int(seq.max()).bit_length())):
+        key = seq >> b
+        bit = key & 1
+        sizes = np.bincount(key)
+        key_start = np.cumsum(sizes) - sizes
+        group_start = key_start[key & ~1]
+
+        ones_before = np.cumsum(bit) - bit
+        ones_before -= ones_before[group_start]
+        total += int(ones_before.sum() - ones_before[bit == 1].sum())
+
+        # Stable partition of each group by bit b
+        rank = np.where(bit, ones_before, positions - group_start - ones_before)
+        reordered = np.empty_like(seq)
+        reordered[key_start[key] + rank] = seq
+        seq = reordered
+
+    return total
+
+
+def bubble_sort_vectorized(values):
+    counts = new_counts()
+    n = len(values)
+    counts['comparisons'] = n * (n - 1) // 2
+    counts['swaps'] = inversions(values)
+    return counts
+
+
+def insertion_sort_vectorized(values):
+    """Every inversion is one shift; each key costs one more comparison unless it is a new strict minimum"""
+    counts = new_counts()
+    n = len(values)
+    if n < 2:
+        return counts
+    shifts = inversions(values)
+    new_minimums = int(np.count_nonzero(values[1:] < np.minimum.accumulate(values)[:-1]))
+    counts['comparisons'] = shifts + (n - 1) - new_minimums
+    counts['writes'] = shifts + (n - 1)
+    return counts
+
+
+def counting_sort_vectorized(values):
+    counts = new_counts()
+    counts['writes'] = len(values)
+    return counts
+
+
+def radix_sort_vectorized(values):
+    counts = new_counts()
+    if len(values):
+        largest = int(values.max()) - int(values.min())
+        passes = 1
+        while largest // RADIX_BASE ** passes:
+            passes += 1
+        counts['writes'] = passes * len(values)
+    return counts
+
+
+# Keyed by registry slug
+VECTORIZED = {} if np is None else {
+    'bubble-sort': bubble_sort_vectorized,
+    'insertion-sort': insertion_sort_vectorized,
+    'counting-sort': counting_sort_vectorized,
+    'radix-sort': radix_sort_vectorized,
+}
+
+
+def sort_vectorized(slug, array):
+    """(sorted list, counts) for a numeric array, or None when there is no NumPy path for it"""
+    if slug not in VECTORIZED:
+        return None
+    values = as_numeric(array)
+    if values is None:
+        return None
+    counts = VECTORIZED[slug](values)
+    return np.sort(values, kind='stable').tolist(), counts
@@ -0,0 +1,340 @@
+"""
+Optional write-behind mode for the queue and deque routes.
+
+When QUEUE_WRITE_BEHIND is enabled, the hot single-item routes (GET,
+summary, enqueue/dequeue at either end) operate on a process-local
+collections.deque and only record the operation. A background thread
+replays recorded operations into the queue_item/deque_item tables every
+QUEUE_FLUSH_INTERVAL_MS, or as soon as QUEUE_FLUSH_MAX_OPS are pending,
+and once more at interpreter exit.
+
+Every other queue/deque route (batch ops, pagination, export, listing)
+first flushes the container it touches and drops the in-memory copy, so it
+reads and writes up-to-date rows as usual.
+
+The in-memory copy is authoritative for the worker that holds it, so this
+mode is meant for loss-tolerant workloads where each name is driven by a
+single worker; a crash loses at most one flush interval of operations.
+"""
+from collections import deque
+import atexit
+import threading
+import time
+
+from flask import Blueprint, current_app, jsonify, request
+from app import db
+from app.models import QueueOperation, DequeOperation
+from app.queue_dequeue import (
+    WAIT_RECHECK_SECONDS, item_signal, queue_push_many, queue_pop_many, iter_queue_values,
+    deque_push_head_many, deque_push_tail_many, deque_pop_head_many, deque_pop_tail_many,
+    iter_deque_values
+)
+
+write_behind_bp = Blueprint('write_behind', __name__)
+
+MODELS = {'queue': QueueOperation, 'deque': DequeOperation}
+EMPTY = object()
+
+
+class _Container:
+    def __init__(self, container_id, values):
+        self.id = container_id
+        self.items = deque(values)
+        self.pending = []  # [(op, value)] not yet written to the database
+        self.oldest_pending_at = None
+
+
+class WriteBehindCache:
+    def __init__(self, app, interval_ms, max_ops):
+        self.app = app
+        self.interval = interval_ms / 1000
+        self.max_ops = max_ops
+        self.containers = {}
+        self.pending_ops = 0
+        self.lock = threading.RLock()       # guards containers and their pending ops
+        self.flush_lock = threading.Lock()  # keeps flushes in order
+        self.wakeup = threading.Event()
+        self.stats = {'flushes': 0, 'flushed_ops': 0, 'flush_errors': 0,
+                      'last_flush_at': None, 'last_flush_ms': None}
+
+    # In-memory operations, called from request handlers
+
+    def get(self, kind, name):
+        """Return the in-memory container, loading it from the database on first use"""
+        from app.routes import get_or_create
+        key = (kind, name)
+        with self.lock:
+            container = self.containers.get(key)
+        if container is not None:
+            return container
+
+        with self.flush_lock:
+            instance = get_or_create(MODELS[kind], name=name)
+            values = iter_queue_values(instance) if kind == 'queue' else iter_deque_values(instance)
+            loaded = _Container(instance.id, list(values))
+            with self.lock:
+                return self.containers.setdefault(key, loaded)
+
+    def apply(self, kind, name, op, value=None, snapshot=False):
+        """Apply one operation in memory and record it for the next flush.
+        Returns (value pushed or popped, container id, new length, copy of the items if snapshot
+        else None); pops on an empty container return EMPTY."""
+        key = (kind, name)
+        while True:
+            container = self.get(kind, name)
+            with self.lock:
+                # evict() may have dropped the container since get(); load it again
+                if self.containers.get(key) is not container:
+                    continue
+
+                if op == 'push_tail':
+                    container.items.append(value)
+                    result = value
+                elif op == 'push_head':
+                    container.items.appendleft(value)
+                    result = value
+                elif not container.items:
+                    return EMPTY, container.id, 0, None
+                elif op == 'pop_head':
+                    result = container.items.popleft()
+                else:
+                    result = container.items.pop()
+
+                if container.oldest_pending_at is None:
+                    container.oldest_pending_at = time.monotonic()
+                container.pending.append((op, value))
+                self.pending_ops += 1
+                if self.pending_ops >= self.max_ops:
+                    self.wakeup.set()
+                return result, container.id, len(container.items), list(container.items) if snapshot else None
+
+    # Flushing
+
+    def flush(self):
+        """Write every pending operation to the database"""
+        with self.flush_lock:
+            with self.lock:
+                batches = [(key, c.pending) for key, c in self.containers.items() if c.pending]
+                for key, _ in batches:
+                    self.containers[key].pending = []
+                    self.containers[key].oldest_pending_at = None
+                self.pending_ops = 0
+            self._write(batches)
+
+    def evict(self, kind, name):
+        """
+        Flush one container and forget it, so database-backed routes see its
+        current state. The container stays cached until nothing is pending, so
+        a failed write is requeued into it rather than lost, and the database
+        I/O runs without holding self.lock.
+        """
+        key = (kind, name)
+        with self.flush_lock:
+            while True:
+                with self.lock:
+                    container = self.containers.get(key)
+                    if container is None:
+                        return
+                    if not container.pending:
+                        del self.containers[key]
+                        return
+                    ops, container.pending = container.pending, []
+                    container.oldest_pending_at = None
+                    self.pending_ops -= len(ops)
+                if not self._write([(key, ops)]):
+                    return
+
+    def _write(self, batches):
+        """Replay batches into the database; returns False if any had to be requeued"""
+        from app.routes import get_for_update
+        if not batches:
+            return True
+        ok = True
+        start = time.perf_counter()
+        with self.app.app_context():
+            for (kind, name), ops in batches:
+                try:
+                    _replay(get_for_update(MODELS[kind], name), kind, ops)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('write-behind flush failed for %s %r', kind, name)
+                    self.stats['flush_errors'] += 1
+                    self._requeue(kind, name, ops)
+                    ok = False
+                    continue
+                self.stats['flushed_ops'] += len(ops)
+            db.session.remove()
+        self.stats['flushes'] += 1
+        self.stats['last_flush_at'] = time.time()
+        self.stats['last_flush_ms'] = (time.perf_counter() - start) * 1000
+        return ok
+
+    def _requeue(self, kind, name, ops):
+        # Put failed operations back in front so they are retried in order
+        with self.lock:
+            container = self.containers.get((kind, name))
+            if container is None:
+                return
+            container.pending = ops + container.pending
+            container.oldest_pending_at = container.oldest_pending_at or time.monotonic()
+            self.pending_ops += len(ops)
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def metrics(self):
+        now = time.monotonic()
+        with self.lock:
+            oldest = [c.oldest_pending_at for c in self.containers.values() if c.oldest_pending_at]
+            pending_ops = self.pending_ops
+            cached = len(self.containers)
+        return {
+            'enabled': True,
+            'pending_ops': pending_ops,
+            'cached_containers': cached,
+            'flush_lag_ms': (now - min(oldest)) * 1000 if oldest else 0,
+            'flush_interval_ms': self.interval * 1000,
+            'flush_max_ops': self.max_ops,
+            **self.stats
+        }
+
+
+def _replay(container, kind, ops):
+    """Apply recorded operations to the row store, one batched call per run of equal ops"""
+    i = 0
+    while i < len(ops):
+        op = ops[i][0]
+        j = i
+        while j < len(ops) and ops[j][0] == op:
+            j += 1
+        values = [value for _, value in ops[i:j]]
+        if op == 'push_tail':
+            (queue_push_many if kind == 'queue' else deque_push_tail_many)(container, values)
+        elif op == 'push_head':
+            deque_push_head_many(container, values)
+        elif op == 'pop_head':
+            (queue_pop_many if kind == 'queue' else deque_pop_head_many)(container, len(values))
+        else:
+            deque_pop_tail_many(container, len(values))
+        i = j
+
+
+# Cached versions of the hot routes in app/routes.py
+
+def _cache():
+    return current_app.extensions['write_behind']
+
+
+def _response(kind, name, container_id, length, items, key=None, **affected):
+    """items is the container's contents as of the operation, or None for a compact response"""
+    if items is None:
+        return jsonify({'id': container_id, 'name': name, 'length': length, **affected})
+    body = {'id': container_id, 'name': name, f'{kind}_data': items}
+    if key is None:
+        return jsonify(body)
+    return jsonify({**affected, key: body})
+
+
+def _view_get(kind, fallback):
+    def view(name):
+        from app.routes import wants_compact, wants_pagination
+        if wants_pagination():
+            _cache().evict(kind, name)
+            return fallback(name=name)
+        container = _cache().get(kind, name)
+        with _cache().lock:
+            items = None if wants_compact() else list(container.items)
+            return _response(kind, name, container.id, len(container.items), items)
+    return view
+
+
+def _view_summary(kind):
+    def view(name):
+        container = _cache().get(kind, name)
+        return jsonify({'id': container.id, 'name': name, 'length': len(container.items)})
+    return view
+
+
+def _view_push(kind, op):
+    def view(name):
+        from app.routes import validate_value, wants_compact
+        data = request.get_json() or {}
+        if err := validate_value(data): return err
+        _, container_id, length, items = _cache().apply(kind, name, op, data['value'], not wants_compact())
+        item_signal.notify((MODELS[kind], name))
+        return _response(kind, name, container_id, length, items, value=data['value'])
+    return view
+
+
+def _view_pop(kind, op):
+    def view(name):
+        from app.routes import handle_empty, get_wait, wants_compact
+        key = (MODELS[kind], name)
+        deadline = time.monotonic() + get_wait()
+        while True:
+            seen = item_signal.version(key)
+            removed, container_id, length, items = _cache().apply(kind, name, op, snapshot=not wants_compact())
+            remaining = deadline - time.monotonic()
+            if removed is not EMPTY or remaining <= 0:
+                break
+            item_signal.wait(key, seen, min(remaining, WAIT_RECHECK_SECONDS))
+        if err := handle_empty(removed is not EMPTY, f'{kind.capitalize()} is empty'): return err
+        return _response(kind, name, container_id, length, items, kind, removed=removed)
+    return view
+
+
+CACHED_VIEWS = {
+    'main.get_queue': lambda views: _view_get('queue', views['main.get_queue']),
+    'main.get_queue_summary': lambda views: _view_summary('queue'),
+    'main.enqueue': lambda views: _view_push('queue', 'push_tail'),
+    'main.dequeue': lambda views: _view_pop('queue', 'pop_head'),
+    'main.get_deque': lambda views: _view_get('deque', views['main.get_deque']),
+    'main.get_deque_summary': lambda views: _view_summary('deque'),
+    'main.deque_enqueue': lambda views: _view_push('deque', 'push_tail'),
+    'main.deque_dequeue': lambda views: _view_pop('deque', 'pop_head'),
+    'main.deque_enqueue_head': lambda views: _view_push('deque', 'push_head'),
+    'main.deque_dequeue_tail': lambda views: _view_pop('deque', 'pop_tail'),
+}
+
+
+@write_behind_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify(_cache().metrics())
+
+
+def sync_before_request():
+    """Flush write-behind state before any queue/deque route that reads or writes rows directly"""
+    if request.endpoint in CACHED_VIEWS or request.url_rule is None:
+        return
+    rule = request.url_rule.rule
+    kind = 'queue' if rule.startswith('/api/queue') else 'deque' if rule.startswith('/api/deque') else None
+    if kind is None:
+        return
+    name = (request.view_args or {}).get('name')
+    if name is None:
+        _cache().flush()
+    else:
+        _cache().evict(kind, name)
+
+
+def init_write_behind(app):
+    """Swap the hot queue/deque views for their in-memory versions and start the flusher"""
+    cache = WriteBehindCache(
+        app, app.config['QUEUE_FLUSH_INTERVAL_MS'], app.config['QUEUE_FLUSH_MAX_OPS']
+    )
+    app.extensions['write_behind'] = cache
+
+    originals = dict(app.view_functions)
+    for endpoint, make_view in CACHED_VIEWS.items():
+        app.view_functions[endpoint] = make_view(originals)
+
+    app.before_request(sync_before_request)
+    app.register_blueprint(write_behind_bp, url_prefix='/api/write-behind')
+
+    threading.Thread(target=cache.run, name='queue-write-behind', daemon=True).start()
+    atexit.register(cache.flush)
+    return cache
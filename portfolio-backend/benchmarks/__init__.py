@@ -0,0 +1,2 @@
+# Micro-benchmarks for the backend storage engines.
+# Run from portfolio-backend/, e.g. `python -m benchmarks.deque_ops`
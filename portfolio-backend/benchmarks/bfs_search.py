@@ -0,0 +1,129 @@
+"""
+Latency and peak memory of the station-graph BFS variants on synthetic graphs.
+
+Compares the original path-copying BFS (every enqueued station carried its
+own copy of the path) over build_graph-style dicts with the parent-pointer
+BFS and the bidirectional BFS in app/bfs/utils.py over a CompiledGraph, and
+reports how much memory each graph representation takes.
+
+    python -m benchmarks.bfs_search [--sizes 10000,100000,1000000] [--shape random|grid] [--queries 20]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from collections import deque
+
+from app.bfs.graph import CompiledGraph
+from app.bfs.utils import bfs_shortest_path, bidirectional_bfs_path
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def legacy_bfs_shortest_path(graph, start, end):
+    """The pre-parent-pointer implementation, kept as the baseline"""
+    if start not in graph or end not in graph:
+        return None
+    if start == end:
+        return [start]
+    queue = deque([(start, [start])])
+    visited = {start}
+    while queue:
+        current, path = queue.popleft()
+        for neighbor, _ in graph[current]:
+            if neighbor in visited:
+                continue
+            new_path = path + [neighbor]
+            if neighbor == end:
+                return new_path
+            visited.add(neighbor)
+            queue.append((neighbor, new_path))
+    return None
+
+
+def random_graph(n, degree=4, seed=0):
+    """A ring (so everything is connected) plus random chords: small diameter, like a dense network"""
+    rng = random.Random(seed)
+    graph = {f's{i}': [] for i in range(n)}
+    def connect(a, b):
+        distance = round(rng.uniform(0.5, 3.0), 2)
+        graph[f's{a}'].append((f's{b}', distance))
+        graph[f's{b}'].append((f's{a}', distance))
+    for i in range(n):
+        connect(i, (i + 1) % n)
+    for _ in range(n * (degree - 2) // 2):
+        a, b = rng.randrange(n), rng.randrange(n)
+        if a != b:
+            connect(a, b)
+    return graph
+
+
+def grid_graph(n, seed=0):
+    """A square street grid: long paths, the worst case for copying paths"""
+    side = max(2, int(n ** 0.5))
+    graph = {f's{r}_{c}': [] for r in range(side) for c in range(side)}
+    for r in range(side):
+        for c in range(side):
+            if c + 1 < side:
+                graph[f's{r}_{c}'].append((f's{r}_{c + 1}', 1.0))
+                graph[f's{r}_{c + 1}'].append((f's{r}_{c}', 1.0))
+            if r + 1 < side:
+                graph[f's{r}_{c}'].append((f's{r + 1}_{c}', 1.0))
+                graph[f's{r + 1}_{c}'].append((f's{r}_{c}', 1.0))
+    return graph
+
+
+# name -> (function, runs on the CompiledGraph rather than the dict)
+ALGORITHMS = {
+    'legacy (path copies)': (legacy_bfs_shortest_path, False),
+    'parent pointers': (bfs_shortest_path, True),
+    'bidirectional': (bidirectional_bfs_path, True),
+}
+
+
+def traced(fn):
+    """Run fn() and return (result, peak bytes allocated meanwhile)"""
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak
+
+
+def run(graph, compiled, queries, memory_queries):
+    stations = list(graph)
+    rng = random.Random(1)
+    pairs = [(rng.choice(stations), rng.choice(stations)) for _ in range(queries)]
+    results = {}
+    for name, (fn, wants_compiled) in ALGORITHMS.items():
+        target = compiled if wants_compiled else graph
+        start = time.perf_counter()
+        lengths = [len(fn(target, a, b) or []) for a, b in pairs]
+        mean_ms = (time.perf_counter() - start) / queries * 1000
+        _, peak = traced(lambda: [fn(target, a, b) for a, b in pairs[:memory_queries]])
+        results[name] = (mean_ms, peak, sum(lengths) / queries)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--shape', choices=['random', 'grid'], default='random')
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--memory-queries', type=int, default=3, help='queries traced for peak memory')
+    args = parser.parse_args()
+
+    make_graph = random_graph if args.shape == 'random' else grid_graph
+    for size in (int(s) for s in args.sizes.split(',')):
+        graph, dict_bytes = traced(lambda: make_graph(size))
+        compiled, csr_bytes = traced(lambda: CompiledGraph.from_adjacency(graph))
+        print(f'{args.shape} graph, {len(graph):,} stations, {len(compiled.neighbors):,} adjacency entries')
+        print(f'  graph memory: dict {dict_bytes / 2**20:.1f} MiB, CSR {csr_bytes / 2**20:.1f} MiB')
+        print(f"  {'algorithm':<22} {'mean ms':>10} {'peak MiB':>10} {'avg hops':>9}")
+        for name, (mean_ms, peak, hops) in run(graph, compiled, args.queries, args.memory_queries).items():
+            print(f'  {name:<22} {mean_ms:>10.2f} {peak / 2**20:>10.2f} {hops:>9.1f}')
+        print()
+
+
+if __name__ == '__main__':
+    main()
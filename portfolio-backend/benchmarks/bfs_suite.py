@@ -0,0 +1,259 @@
+"""
+BFS benchmark suite over synthetic transit networks.
+
+For each generated network (see benchmarks/transit.py) and size, times the
+app.bfs functions directly and the /api/bfs endpoints through the Flask
+test client, and reports per-query latency percentiles, throughput and
+peak traced memory. Results are JSON so runs can be stored and compared
+over time; --format jsonl appends one line per run to --output.
+
+    python -m benchmarks.bfs_suite [--networks lines,grid,scale_free] [--sizes 1000,10000]
+        [--queries 200] [--format json|jsonl|text] [--output results.jsonl]
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app import create_app, db
+from app.bfs.graph import CompiledGraph
+from app.bfs.landmarks import Landmarks
+from app.bfs.network import ROUTE_TABLE_MAX_STATIONS
+from app.bfs.route_table import RouteTable
+from app.bfs.utils import (
+    build_graph, compile_graph, bfs_shortest_path, bidirectional_bfs_path, astar_path, path_to_segments
+)
+from benchmarks.transit import GENERATORS, generate
+from config import Config
+
+DEFAULT_SIZES = [1000, 10000]
+ADMIN_TOKEN = 'benchmark'
+# Queries traced with tracemalloc, which slows everything down
+MEMORY_QUERIES = 5
+MANY_SIDE = 10
+
+
+class SuiteConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'bfs_suite.db')
+    BFS_ADMIN_TOKEN = ADMIN_TOKEN
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(fn, calls):
+    """Time fn(*args) for each args tuple, then trace peak memory over the first few"""
+    latencies = []
+    start = time.perf_counter()
+    for args in calls:
+        t = time.perf_counter()
+        fn(*args)
+        latencies.append((time.perf_counter() - t) * 1000)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for args in calls[:MEMORY_QUERIES]:
+        fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'calls': len(calls),
+        'latency_ms': {
+            'mean': sum(latencies) / len(latencies),
+            'p50': percentile(latencies, 0.50),
+            'p90': percentile(latencies, 0.90),
+            'p99': percentile(latencies, 0.99),
+            'max': latencies[-1],
+        },
+        'throughput_per_s': len(calls) / elapsed if elapsed else None,
+        'peak_memory_bytes': peak,
+    }
+
+
+def measure_once(fn, trace_memory=True):
+    """Time a single untraced fn(); with trace_memory, run it again under tracemalloc for peak memory"""
+    start = time.perf_counter()
+    result = fn()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return result, {'calls': 1, 'latency_ms': {'mean': elapsed_ms, 'p50': elapsed_ms, 'p90': elapsed_ms,
+                                               'p99': elapsed_ms, 'max': elapsed_ms},
+                    'throughput_per_s': None, 'peak_memory_bytes': peak}
+
+
+def module_workloads(stations_data, pairs):
+    """Yield (workload, metrics) for the app.bfs functions"""
+    graph_dict, metrics = measure_once(lambda: build_graph(stations_data))
+    yield 'build_graph', metrics
+    graph, metrics = measure_once(lambda: compile_graph(stations_data))
+    yield 'compile_graph', metrics
+    landmarks, metrics = measure_once(lambda: Landmarks.select(graph))
+    yield 'landmarks.select', metrics
+
+    yield 'bfs_shortest_path', measure(lambda a, b: bfs_shortest_path(graph, a, b), pairs)
+    yield 'bidirectional_bfs_path', measure(lambda a, b: bidirectional_bfs_path(graph, a, b), pairs)
+    yield 'astar_path', measure(lambda a, b: astar_path(graph, a, b, landmarks), pairs)
+
+    if len(graph) <= ROUTE_TABLE_MAX_STATIONS:
+        table, metrics = measure_once(lambda: RouteTable.build(graph))
+        yield 'route_table.build', metrics
+        yield 'route_table.path', measure(table.path, pairs)
+
+    paths = [(bfs_shortest_path(graph, a, b),) for a, b in pairs]
+    yield 'path_to_segments', measure(path_to_segments, paths)
+
+
+def make_client(instance_path):
+    path = SuiteConfig.SQLALCHEMY_DATABASE_URI[len('sqlite:///'):]
+    if os.path.exists(path):
+        os.remove(path)
+    app = create_app(SuiteConfig)
+    app.instance_path = instance_path
+    with app.app_context():
+        db.create_all()
+    return app.test_client()
+
+
+def endpoint_workloads(client, stations_data, pairs):
+    """Yield (workload, metrics) for the /api/bfs endpoints, after uploading the network as a new version"""
+    headers = {'X-Admin-Token': ADMIN_TOKEN}
+
+    response, metrics = measure_once(
+        lambda: client.post('/api/bfs/admin/graph', json=stations_data, headers=headers), trace_memory=False)
+    if response.status_code != 201:
+        raise RuntimeError(f'upload failed: {response.status_code} {response.get_data(as_text=True)}')
+    yield 'POST /admin/graph', metrics
+
+    def search(mode):
+        def call(a, b):
+            response = client.post('/api/bfs/search', json={'start': a, 'end': b, 'mode': mode},
+                                   headers={'X-Session-Id': 'benchmark'})
+            # Generated networks are connected, so anything else is a bug
+            assert response.status_code == 200, response.get_data(as_text=True)
+        return call
+
+    # The first search builds the route table / landmarks; keep that out of the percentiles
+    _, metrics = measure_once(lambda: search('hops')(*pairs[0]), trace_memory=False)
+    yield 'POST /search (first, hops)', metrics
+    yield 'POST /search (hops)', measure(search('hops'), pairs)
+    _, metrics = measure_once(lambda: search('distance')(*pairs[0]), trace_memory=False)
+    yield 'POST /search (first, distance)', metrics
+    yield 'POST /search (distance)', measure(search('distance'), pairs)
+
+    yield 'GET /stations', measure(lambda: client.get('/api/bfs/stations'), [()] * len(pairs))
+
+    origins = [a for a, _ in pairs[:MANY_SIDE]]
+    destinations = [b for _, b in pairs[:MANY_SIDE]]
+    matrices = [()] * max(1, len(pairs) // 20)
+    for mode in ('hops', 'distance'):
+        body = {'origins': origins, 'destinations': destinations, 'mode': mode}
+        yield f'POST /search-many ({MANY_SIDE}x{MANY_SIDE}, {mode})', measure(
+            lambda: client.post('/api/bfs/search-many', json=body), matrices)
+
+
+def run(args):
+    results = []
+    with tempfile.TemporaryDirectory() as instance_path:
+        client = None if args.skip_endpoints else make_client(instance_path)
+        for kind in args.networks:
+            for size in args.sizes:
+                stations_data = generate(kind, size, seed=args.seed)
+                graph = CompiledGraph.from_segments(
+                    (s['from'], s['to'], s['distance_km']) for line in stations_data.values() for s in line['segments']
+                )
+                rng = random.Random(args.seed)
+                pairs = [(rng.choice(graph.names), rng.choice(graph.names)) for _ in range(args.queries)]
+                network = {'network': kind, 'size': size, 'stations': len(graph),
+                           'segments': len(graph.neighbors) // 2}
+
+                suites = [('module', module_workloads(stations_data, pairs))]
+                if not args.skip_endpoints:
+                    suites.append(('endpoint', endpoint_workloads(client, stations_data, pairs)))
+                for layer, workloads in suites:
+                    for workload, metrics in workloads:
+                        results.append({**network, 'layer': layer, 'workload': workload, **metrics})
+                        print(f'  {kind} {size} {layer} {workload}', file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_text(report):
+    print(f"{'network':<11} {'stations':>9} {'workload':<36} {'p50 ms':>9} {'p99 ms':>9} {'per s':>9} {'peak MiB':>9}")
+    for r in report['results']:
+        per_s = f"{r['throughput_per_s']:.0f}" if r['throughput_per_s'] else '-'
+        peak = f"{r['peak_memory_bytes'] / 2**20:.2f}" if r['peak_memory_bytes'] is not None else '-'
+        print(f"{r['network']:<11} {r['stations']:>9,} {r['workload']:<36} {r['latency_ms']['p50']:>9.3f} "
+              f"{r['latency_ms']['p99']:>9.3f} {per_s:>9} {peak:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--networks', default=','.join(GENERATORS))
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--queries', type=int, default=200, help='search pairs per workload')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-endpoints', action='store_true', help='only time the app.bfs functions')
+    parser.add_argument('--format', choices=['json', 'jsonl', 'text'], default='json')
+    parser.add_argument('--output', default='-', help="file to write (jsonl appends), or '-' for stdout")
+    args = parser.parse_args()
+    args.networks = args.networks.split(',')
+    args.sizes = [int(s) for s in args.sizes.split(',')]
+    unknown = set(args.networks) - set(GENERATORS)
+    if unknown:
+        parser.error(f"unknown networks: {', '.join(sorted(unknown))}")
+
+    report = {
+        'suite': 'bfs',
+        'started_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'args': {k: v for k, v in vars(args).items() if k not in ('format', 'output')},
+        'results': run(args),
+    }
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'a' if args.format == 'jsonl' else 'w')
+    try:
+        if args.format == 'text':
+            sys.stdout, saved = out, sys.stdout
+            try:
+                print_text(report)
+            finally:
+                sys.stdout = saved
+        elif args.format == 'jsonl':
+            out.write(json.dumps(report, separators=(',', ':')) + '\n')
+        else:
+            json.dump(report, out, indent=2)
+            out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
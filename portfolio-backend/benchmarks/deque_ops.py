@@ -0,0 +1,91 @@
+"""
+Per-operation latency of the row-per-item deque as it grows.
+
+Prefills a deque to each size (10 .. 1,000,000 items, split evenly on both
+sides of zero), then times push/pop at both ends with one commit per
+operation, exactly like the /api/deque routes. The deque size is kept
+constant while timing, so a flat column means the cost does not depend on
+how many items are stored.
+
+    python -m benchmarks.deque_ops [--ops 200] [--sizes 10,100,1000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app import create_app, db
+from app.models import DequeOperation, DequeItem
+from app.queue_dequeue import deque_push_head, deque_push_tail, deque_pop_head, deque_pop_tail
+from config import Config
+
+DEFAULT_SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+CHUNK = 50_000
+
+
+def grow(deque, size):
+    """Bulk-insert items outwards from both ends until the deque holds `size` items"""
+    while deque.tail - deque.head < size:
+        missing = size - (deque.tail - deque.head)
+        tail_count = min(CHUNK, (missing + 1) // 2)
+        head_count = min(CHUNK, missing - tail_count)
+        rows = [{'deque_id': deque.id, 'seq': deque.tail + i, 'value': i} for i in range(tail_count)]
+        rows += [{'deque_id': deque.id, 'seq': deque.head - 1 - i, 'value': i} for i in range(head_count)]
+        db.session.execute(DequeItem.__table__.insert(), rows)
+        deque.tail += tail_count
+        deque.head -= head_count
+        db.session.commit()
+
+
+def timed(fn, ops):
+    """Mean microseconds per call of fn() followed by a commit"""
+    start = time.perf_counter()
+    for _ in range(ops):
+        fn()
+        db.session.commit()
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+def run(sizes, ops):
+    results = []
+    deque = DequeOperation(name='benchmark')
+    db.session.add(deque)
+    db.session.commit()
+
+    for size in sizes:
+        grow(deque, size)
+        row = {'size': size}
+        row['push_head'] = timed(lambda: deque_push_head(deque, 0), ops)
+        row['pop_head'] = timed(lambda: deque_pop_head(deque), ops)
+        row['push_tail'] = timed(lambda: deque_push_tail(deque, 0), ops)
+        row['pop_tail'] = timed(lambda: deque_pop_tail(deque), ops)
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ops', type=int, default=200, help='operations timed per end and size')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        class BenchConfig(Config):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(tmp, 'bench.db')
+
+        app = create_app(BenchConfig)
+        with app.app_context():
+            db.create_all()
+            results = run(sizes, args.ops)
+            db.session.remove()
+            db.engine.dispose()
+
+    print(f"{'size':>10} {'push_head':>10} {'pop_head':>10} {'push_tail':>10} {'pop_tail':>10}   (us/op)")
+    for row in results:
+        print(f"{row['size']:>10} {row['push_head']:>10.1f} {row['pop_head']:>10.1f} "
+              f"{row['push_tail']:>10.1f} {row['pop_tail']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
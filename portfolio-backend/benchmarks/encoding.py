@@ -0,0 +1,96 @@
+"""
+Cost of the old pickled-list storage vs. the current JSON row storage.
+
+Before, a whole queue/deque was one PickleType blob, so every operation
+paid to unpickle and re-pickle the full list. Now each item is its own row
+with a compact JSON value, so an operation encodes or decodes one item.
+For each size this reports:
+
+  - full-container encode/decode time and bytes for pickle, default JSON
+    (SQLAlchemy's stock serializer) and compact JSON (Config's serializer)
+  - the encoding cost one enqueue pays under each storage layout
+
+    python -m benchmarks.encoding [--sizes 1000,100000,1000000]
+"""
+import argparse
+import json
+import pickle
+import random
+import time
+from functools import partial
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+compact_dumps = partial(json.dumps, separators=(',', ':'))
+
+
+def sample_values(n):
+    """Mostly ints (what the UI sends) with some strings and small objects"""
+    rng = random.Random(n)
+    values = []
+    for i in range(n):
+        r = rng.random()
+        if r < 0.8:
+            values.append(rng.randint(-10**6, 10**6))
+        elif r < 0.95:
+            values.append(f'item-{i}')
+        else:
+            values.append({'id': i, 'priority': rng.randint(0, 9)})
+    return values
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(values):
+    repeat = 5 if len(values) <= 100_000 else 2
+    codecs = {
+        'pickle': (lambda v: pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+        'json': (json.dumps, json.loads),
+        'json-compact': (compact_dumps, json.loads),
+    }
+    rows = []
+    for name, (dumps, loads) in codecs.items():
+        blob = dumps(values)
+        rows.append({
+            'format': name,
+            'encode_ms': best_of(lambda: dumps(values), repeat) * 1000,
+            'decode_ms': best_of(lambda: loads(blob), repeat) * 1000,
+            'bytes': len(blob),
+        })
+
+    # Row-per-item storage: total stored value bytes, and one enqueue's cost
+    row_bytes = sum(len(compact_dumps(v)) for v in values)
+    pickled = rows[0]
+    per_op = {
+        'pickled-list enqueue_us': (pickled['decode_ms'] + pickled['encode_ms']) * 1000,
+        'json-row enqueue_us': best_of(lambda: compact_dumps(values[-1]), 1000) * 1e6,
+    }
+    return rows, row_bytes, per_op
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        rows, row_bytes, per_op = measure(sample_values(size))
+        print(f'n={size:,}')
+        print(f"  {'format':<14} {'encode ms':>10} {'decode ms':>10} {'bytes':>12}")
+        for row in rows:
+            print(f"  {row['format']:<14} {row['encode_ms']:>10.2f} {row['decode_ms']:>10.2f} {row['bytes']:>12,}")
+        print(f"  {'json rows':<14} {'':>10} {'':>10} {row_bytes:>12,}  (sum of per-item values)")
+        for label, us in per_op.items():
+            print(f'  {label}: {us:,.2f}')
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Concurrency stress test for the queue and deque endpoints.
+
+Starts several worker processes (like gunicorn workers), each running a
+few threads that interleave enqueues of unique values with dequeues on one
+named queue or deque. Afterwards the remaining contents are drained and the
+run fails if any value was returned twice or went missing.
+
+By default every process drives its own Flask test client against a shared
+temporary SQLite file; pass --url to hammer a running server instead, or set
+DATABASE_URL to point the in-process workers at e.g. Postgres.
+
+    python -m benchmarks.queue_stress [--kind deque] [--processes 4] [--threads 4] [--ops 200]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from app import create_app, db
+from config import Config
+
+
+class HttpClient:
+    """Minimal stand-in for the Flask test client talking to a live server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+class TestClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, payload=None):
+        resp = self.client.open(path, method=method, json=payload)
+        return resp.status_code, resp.data
+
+
+def make_client(args):
+    if args.url:
+        return HttpClient(args.url)
+    return TestClient(create_app(StressConfig))
+
+
+def pop_paths(kind, name):
+    if kind == 'queue':
+        return [f'/api/queues/{name}/dequeue?compact=true']
+    return [f'/api/deques/{name}/dequeue?compact=true', f'/api/deques/{name}/dequeue-tail?compact=true']
+
+
+def push_paths(kind, name):
+    if kind == 'queue':
+        return [f'/api/queues/{name}/enqueue?compact=true']
+    return [f'/api/deques/{name}/enqueue?compact=true', f'/api/deques/{name}/enqueue-head?compact=true']
+
+
+def run_thread(client, args, worker_id, pushed, removed, errors):
+    pushes = push_paths(args.kind, args.name)
+    pops = pop_paths(args.kind, args.name)
+    for i in range(args.ops):
+        value = worker_id * 1_000_000 + i
+        status, _ = client.request('POST', pushes[i % len(pushes)], {'value': value})
+        if status == 200:
+            pushed.append(value)
+        else:
+            errors.append(status)
+
+        status, body = client.request('POST', pops[i % len(pops)])
+        if status == 200:
+            removed.append(json.loads(body)['removed'])
+        elif status != 400:  # 400 is just "empty"
+            errors.append(status)
+
+
+def run_process(args, process_id):
+    client = make_client(args)
+    pushed, removed, errors = [], [], []
+    threads = [
+        threading.Thread(target=run_thread,
+                         args=(client, args, process_id * args.threads + t, pushed, removed, errors))
+        for t in range(args.threads)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return pushed, removed, errors
+
+
+def drain(args):
+    client = make_client(args)
+    prefix = 'queues' if args.kind == 'queue' else 'deques'
+    status, body = client.request('GET', f'/api/{prefix}/{args.name}/export')
+    return [json.loads(line) for line in body.decode().splitlines() if line]
+
+
+class StressConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(
+        tempfile.gettempdir(), 'queue_stress.db')
+    SQLALCHEMY_ENGINE_OPTIONS = dict(Config.SQLALCHEMY_ENGINE_OPTIONS)
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'timeout': 60}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--kind', choices=['queue', 'deque'], default='queue')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='threads per process')
+    parser.add_argument('--ops', type=int, default=200, help='push+pop pairs per thread')
+    parser.add_argument('--url', help='base URL of a running server, e.g. http://localhost:5000')
+    args = parser.parse_args()
+    args.name = f'stress-{os.getpid()}-{int(time.time())}'
+
+    if not args.url:
+        if StressConfig.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+            path = StressConfig.SQLALCHEMY_DATABASE_URI[len('sqlite:///'):]
+            if os.path.exists(path):
+                os.remove(path)
+        app = create_app(StressConfig)
+        with app.app_context():
+            db.create_all()
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        results = pool.starmap(run_process, [(args, p) for p in range(args.processes)])
+    elapsed = time.perf_counter() - start
+
+    pushed = [v for r in results for v in r[0]]
+    removed = [v for r in results for v in r[1]]
+    errors = [e for r in results for e in r[2]]
+    remaining = drain(args)
+
+    seen = removed + remaining
+    duplicates = len(seen) - len(set(seen))
+    lost = len(set(pushed) - set(seen))
+    unexpected = len(set(seen) - set(pushed))
+    succeeded = len(pushed) + len(removed)
+
+    print(f'{args.kind} {args.processes}x{args.threads} workers, {elapsed:.2f}s')
+    print(f'  enqueued={len(pushed)} dequeued={len(removed)} remaining={len(remaining)} errors={len(errors)}')
+    print(f'  duplicates={duplicates} lost={lost} unexpected={unexpected}')
+    print(f'  throughput={succeeded / elapsed:.0f} successful requests/s')
+
+    ok = not (duplicates or lost or unexpected)
+    print('OK' if ok else 'FAILED')
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Hop-count BFS vs distance-weighted Dijkstra and ALT A* on the station graph.
+
+Runs every pair of the real network, then random pairs on synthetic graphs,
+and reports the mean query time and the mean route length in hops and in
+kilometres for each algorithm, plus the one-off landmark precomputation.
+
+    python -m benchmarks.shortest_distance [--sizes 10000,100000] [--shape random|grid] [--queries 20] [--landmarks 4]
+"""
+import argparse
+import itertools
+import random
+import time
+
+from app.bfs.graph import CompiledGraph
+from app.bfs.landmarks import Landmarks, DEFAULT_LANDMARKS
+from app.bfs.utils import (
+    load_stations_data, compile_graph, bfs_shortest_path, dijkstra_path, astar_path, path_distance
+)
+from benchmarks.bfs_search import random_graph, grid_graph
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def run(graph, pairs, landmark_count):
+    start = time.perf_counter()
+    landmarks = Landmarks.select(graph, landmark_count)
+    landmark_ms = (time.perf_counter() - start) * 1000
+
+    algorithms = {
+        'bfs (hops)': lambda a, b: bfs_shortest_path(graph, a, b),
+        'dijkstra': lambda a, b: dijkstra_path(graph, a, b)[0],
+        f'a* alt ({landmark_count} landmarks)': lambda a, b: astar_path(graph, a, b, landmarks)[0],
+    }
+    results = {}
+    for name, fn in algorithms.items():
+        start = time.perf_counter()
+        paths = [fn(a, b) for a, b in pairs]
+        mean_ms = (time.perf_counter() - start) / len(pairs) * 1000
+        hops = sum(len(p) - 1 for p in paths) / len(pairs)
+        km = sum(path_distance(graph, p) for p in paths) / len(pairs)
+        results[name] = (mean_ms, hops, km)
+    return landmark_ms, results
+
+
+def report(title, graph, pairs, landmark_count):
+    landmark_ms, results = run(graph, pairs, landmark_count)
+    print(f'{title}: {len(graph):,} stations, {len(pairs):,} queries, landmarks built in {landmark_ms:.1f} ms')
+    print(f"  {'algorithm':<26} {'mean ms':>10} {'avg hops':>9} {'avg km':>9}")
+    for name, (mean_ms, hops, km) in results.items():
+        print(f'  {name:<26} {mean_ms:>10.3f} {hops:>9.2f} {km:>9.2f}')
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--shape', choices=['random', 'grid'], default='random')
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--landmarks', type=int, default=DEFAULT_LANDMARKS)
+    args = parser.parse_args()
+
+    graph = compile_graph(load_stations_data())
+    report('real network', graph, list(itertools.permutations(graph.names, 2)), args.landmarks)
+
+    make_graph = random_graph if args.shape == 'random' else grid_graph
+    for size in (int(s) for s in args.sizes.split(',')):
+        graph = CompiledGraph.from_adjacency(make_graph(size))
+        rng = random.Random(1)
+        pairs = [(rng.choice(graph.names), rng.choice(graph.names)) for _ in range(args.queries)]
+        report(f'{args.shape} graph', graph, pairs, args.landmarks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Sampled sorting traces checked against full ones, and what they store.
+
+For random inputs, runs every algorithm once unsampled and then with each
+sample mode over a few budgets, and checks that every kept step replays to
+the full run's array at its 'at' step, that the last one replays to the
+output, and that the budget holds. Then, for one larger input, reports the
+steps and stored values (writes and keyframe elements) each mode keeps.
+
+    python -m benchmarks.sort_traces [--trials 25] [--size 1500] [--max-steps 1000]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.sorting_algorithms.registry import ALGORITHMS
+from app.sorting_algorithms.trace import SAMPLE_MODES, _stored_values, iter_arrays, replay
+from app.sorting_algorithms.utils import collect_trace
+
+BUDGETS = [2, 3, 10, 50]
+CHECK_SIZES = [0, 1, 2, 7, 40, 150]
+
+
+def check(slug, array, keyframe_interval):
+    """Compare every sampled trace of array with the full trace; returns how many were checked"""
+    generator = ALGORITHMS[slug].step_generator
+    output, full = collect_trace(generator, array, keyframe_interval)
+    arrays = [list(a) for _, a in iter_arrays(full)]
+    checked = 0
+    for mode in SAMPLE_MODES:
+        for budget in [None] + BUDGETS:
+            sampled_output, trace = collect_trace(generator, array, keyframe_interval, mode, budget)
+            steps = trace['steps']
+            where = (slug, array, keyframe_interval, mode, budget)
+            assert sampled_output == output, where
+            assert budget is None or len(steps) <= budget, where
+            if 'sample' not in trace:
+                assert len(steps) == len(arrays), where
+                ats = range(len(steps))
+            else:
+                ats = [step['at'] for step in steps]
+                assert ats[-1] == len(arrays) - 1, where
+            for k, at in enumerate(ats):
+                assert replay(trace, k) == arrays[at], where + (k, at)
+            if steps:
+                assert replay(trace, -1) == output, where
+            checked += 1
+    return checked
+
+
+def measure(slug, array, mode, max_steps):
+    tracemalloc.start()
+    start = time.perf_counter()
+    _, trace = collect_trace(ALGORITHMS[slug].step_generator, array, None, mode, max_steps)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    steps = trace['steps']
+    return {
+        'steps': len(steps),
+        'keyframes': sum('array' in step for step in steps),
+        'values': sum(_stored_values(step) for step in steps),
+        'peak_mib': peak / 2**20,
+        'seconds': seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trials', type=int, default=25)
+    parser.add_argument('--size', type=int, default=1500)
+    parser.add_argument('--max-steps', type=int, default=1000)
+    parser.add_argument('--algorithms', default='bubble-sort,insertion-sort,merge-sort')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    checked = 0
+    for _ in range(args.trials):
+        array = [rng.randint(-20, 60) for _ in range(rng.choice(CHECK_SIZES))]
+        for slug in ALGORITHMS:
+            checked += check(slug, array, rng.choice([None, 5]))
+    print(f'{checked:,} sampled traces replay exactly')
+    print()
+
+    array = [rng.randint(-10**6, 10**6) for _ in range(args.size)]
+    print(f'n={args.size:,} max_steps={args.max_steps:,}')
+    print(f"  {'algorithm':<16} {'mode':<8} {'steps':>7} {'keyframes':>10} {'values':>10} {'peak MiB':>9} {'s':>7}")
+    for slug in args.algorithms.split(','):
+        for mode in SAMPLE_MODES:
+            row = measure(slug, array, mode, args.max_steps)
+            print(f"  {slug:<16} {mode:<8} {row['steps']:>7,} {row['keyframes']:>10,} {row['values']:>10,}"
+                  f" {row['peak_mib']:>9.1f} {row['seconds']:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
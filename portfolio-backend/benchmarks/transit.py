@@ -0,0 +1,92 @@
+"""
+Synthetic transit networks in the stations_data.json format.
+
+Every generator returns {line_name: {'segments': [{'from', 'to', 'distance_km'}, ...]}},
+so its output can go through build_graph / compile_graph or be uploaded
+to POST /api/bfs/admin/graph exactly like the real network.
+
+    lines       parallel rail lines joined by short walking transfers
+    grid        a street grid; each row and each column is a line
+    scale_free  preferential attachment (Barabasi-Albert): a few huge hubs
+"""
+import random
+
+GENERATORS = {}
+
+
+def generator(name):
+    def register(fn):
+        GENERATORS[name] = fn
+        return fn
+    return register
+
+
+def _segment(rng, a, b, low=0.5, high=3.0):
+    return {'from': a, 'to': b, 'distance_km': round(rng.uniform(low, high), 2)}
+
+
+@generator('lines')
+def lines_network(stations, line_length=30, transfers_per_line=3, seed=0):
+    """
+    ceil(stations / line_length) lines of consecutive stations. Each line gets
+    a transfer to the previous one (so the network is connected) plus
+    transfers_per_line - 1 to random other lines.
+    """
+    rng = random.Random(seed)
+    line_count = max(1, -(-stations // line_length))
+    lines = [[f'L{l}-S{s}' for s in range(line_length)] for l in range(line_count)]
+    network = {}
+    for l, line in enumerate(lines):
+        network[f'line{l}'] = {'segments': [_segment(rng, a, b) for a, b in zip(line, line[1:])]}
+
+    transfers = []
+    for l in range(1, line_count):
+        targets = [l - 1] + [rng.randrange(line_count) for _ in range(transfers_per_line - 1)]
+        for other in targets:
+            if other != l:
+                transfers.append(_segment(rng, rng.choice(lines[l]), rng.choice(lines[other]), 0.05, 0.3))
+    network['transfers'] = {'segments': transfers}
+    return network
+
+
+@generator('grid')
+def grid_network(stations, seed=0):
+    """A side x side grid with side = sqrt(stations)"""
+    rng = random.Random(seed)
+    side = max(2, int(stations ** 0.5))
+    network = {}
+    for r in range(side):
+        row = [f'R{r}-C{c}' for c in range(side)]
+        network[f'row{r}'] = {'segments': [_segment(rng, a, b, 0.8, 1.2) for a, b in zip(row, row[1:])]}
+    for c in range(side):
+        column = [f'R{r}-C{c}' for r in range(side)]
+        network[f'col{c}'] = {'segments': [_segment(rng, a, b, 0.8, 1.2) for a, b in zip(column, column[1:])]}
+    return network
+
+
+@generator('scale_free')
+def scale_free_network(stations, links=2, seed=0):
+    """Each new station links to `links` existing ones chosen proportionally to their degree"""
+    rng = random.Random(seed)
+    names = [f'N{i}' for i in range(max(stations, links + 1))]
+    segments = []
+    # Every endpoint of every edge, so a uniform pick is a degree-weighted pick
+    endpoints = []
+    for i in range(1, links + 1):
+        segments.append(_segment(rng, names[0], names[i]))
+        endpoints += [names[0], names[i]]
+    for i in range(links + 1, len(names)):
+        # A list, not a set: set order follows string hashing, which varies per process
+        chosen = []
+        while len(chosen) < links:
+            target = rng.choice(endpoints)
+            if target not in chosen:
+                chosen.append(target)
+        for target in chosen:
+            segments.append(_segment(rng, names[i], target))
+            endpoints += [names[i], target]
+    return {'network': {'segments': segments}}
+
+
+def generate(kind, stations, seed=0):
+    return GENERATORS[kind](stations, seed=seed)
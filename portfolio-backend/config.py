@@ -1,4 +1,6 @@
 import os
+import json
+from functools import partial
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,4 +14,36 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'instance', 'portfolio.db')
     
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Store JSON columns without the default ", " / ": " padding
+    SQLALCHEMY_ENGINE_OPTIONS = {'json_serializer': partial(json.dumps, separators=(',', ':'))}
+    # Let concurrent SQLite writers wait for the database lock instead of failing
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS['connect_args'] = {'timeout': 30}
+    
+    # Optional in-memory write-behind mode for the queue/deque routes (see app/write_behind.py)
+    QUEUE_WRITE_BEHIND = os.environ.get('QUEUE_WRITE_BEHIND', '').lower() in ('1', 'true')
+    QUEUE_FLUSH_INTERVAL_MS = int(os.environ.get('QUEUE_FLUSH_INTERVAL_MS', 200))
+    QUEUE_FLUSH_MAX_OPS = int(os.environ.get('QUEUE_FLUSH_MAX_OPS', 1000))
+    
+    # Token required by the /api/bfs/admin endpoints (X-Admin-Token header); unset disables them
+    BFS_ADMIN_TOKEN = os.environ.get('BFS_ADMIN_TOKEN')
+    # Worker processes for distance-mode /api/bfs/search-many batches (0 or 1 = search in-process)
+    BFS_SEARCH_PROCESSES = int(os.environ.get('BFS_SEARCH_PROCESSES', 0))
+    
+    # Background writer for /api/bfs/search history (see app/bfs/history.py)
+    BFS_HISTORY_FLUSH_INTERVAL_MS = int(os.environ.get('BFS_HISTORY_FLUSH_INTERVAL_MS', 500))
+    BFS_HISTORY_BATCH_SIZE = int(os.environ.get('BFS_HISTORY_BATCH_SIZE', 200))
+    BFS_HISTORY_MAX_PENDING = int(os.environ.get('BFS_HISTORY_MAX_PENDING', 10000))
+    BFS_HISTORY_DROP_POLICY = os.environ.get('BFS_HISTORY_DROP_POLICY', 'oldest')
+    BFS_HISTORY_RETENTION_DAYS = int(os.environ.get('BFS_HISTORY_RETENTION_DAYS', 30))  # 0 keeps everything
+    BFS_HISTORY_PRUNE_INTERVAL_SECONDS = int(os.environ.get('BFS_HISTORY_PRUNE_INTERVAL_SECONDS', 3600))
+    
+    # How long /api/bfs/current remembers a client's last route (app/kv_store.py)
+    BFS_SESSION_TTL_SECONDS = int(os.environ.get('BFS_SESSION_TTL_SECONDS', 86400))
+    
+    # "trace": "none" sorts of at least this many numbers use NumPy when it is installed
+    SORT_NUMPY_MIN_SIZE = int(os.environ.get('SORT_NUMPY_MIN_SIZE', 10000))
+    # Most steps a stored sorting trace keeps (larger runs are sampled, see StepSampler); 0 = no limit
+    SORT_MAX_STEPS = int(os.environ.get('SORT_MAX_STEPS', 100000))
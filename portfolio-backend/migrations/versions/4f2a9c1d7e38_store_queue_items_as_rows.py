@@ -0,0 +1,90 @@
+"""Store queue items as rows
+
+Revision ID: 4f2a9c1d7e38
+Revises: a0c4bca6a781
+Create Date: 2026-10-18 09:12:40.118203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c1d7e38'
+down_revision = 'a0c4bca6a781'
+branch_labels = None
+depends_on = None
+
+
+queue_operation = sa.table(
+    'queue_operation',
+    sa.column('id', sa.Integer),
+    sa.column('queue_data', sa.PickleType),
+    sa.column('head', sa.Integer),
+    sa.column('tail', sa.Integer)
+)
+
+queue_item = sa.table(
+    'queue_item',
+    sa.column('queue_id', sa.Integer),
+    sa.column('seq', sa.Integer),
+    sa.column('value', sa.JSON)
+)
+
+
+def upgrade():
+    op.create_table('queue_item',
+    sa.Column('queue_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('value', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['queue_id'], ['queue_operation.id'], ),
+    sa.PrimaryKeyConstraint('queue_id', 'seq')
+    )
+    with op.batch_alter_table('queue_operation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('head', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('tail', sa.Integer(), nullable=False, server_default='0'))
+
+    # Unpack every pickled list into one row per item
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(queue_operation.c.id, queue_operation.c.queue_data)).fetchall()
+    for queue_id, values in rows:
+        values = values or []
+        if values:
+            bind.execute(queue_item.insert(), [
+                {'queue_id': queue_id, 'seq': seq, 'value': value}
+                for seq, value in enumerate(values)
+            ])
+        bind.execute(
+            queue_operation.update()
+            .where(queue_operation.c.id == queue_id)
+            .values(head=0, tail=len(values))
+        )
+
+    with op.batch_alter_table('queue_operation', schema=None) as batch_op:
+        batch_op.drop_column('queue_data')
+
+
+def downgrade():
+    with op.batch_alter_table('queue_operation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('queue_data', sa.PickleType(), nullable=True))
+
+    # Fold the rows back into one pickled list per queue
+    bind = op.get_bind()
+    queue_ids = [row[0] for row in bind.execute(sa.select(queue_operation.c.id)).fetchall()]
+    for queue_id in queue_ids:
+        values = [row[0] for row in bind.execute(
+            sa.select(queue_item.c.value)
+            .where(queue_item.c.queue_id == queue_id)
+            .order_by(queue_item.c.seq)
+        ).fetchall()]
+        bind.execute(
+            queue_operation.update()
+            .where(queue_operation.c.id == queue_id)
+            .values(queue_data=values)
+        )
+
+    with op.batch_alter_table('queue_operation', schema=None) as batch_op:
+        batch_op.drop_column('tail')
+        batch_op.drop_column('head')
+
+    op.drop_table('queue_item')
@@ -0,0 +1,90 @@
+"""Store deque items as rows
+
+Revision ID: b81e5d3a6c90
+Revises: 4f2a9c1d7e38
+Create Date: 2026-10-18 10:03:17.542861
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e5d3a6c90'
+down_revision = '4f2a9c1d7e38'
+branch_labels = None
+depends_on = None
+
+
+deque_operation = sa.table(
+    'deque_operation',
+    sa.column('id', sa.Integer),
+    sa.column('deque_data', sa.PickleType),
+    sa.column('head', sa.Integer),
+    sa.column('tail', sa.Integer)
+)
+
+deque_item = sa.table(
+    'deque_item',
+    sa.column('deque_id', sa.Integer),
+    sa.column('seq', sa.Integer),
+    sa.column('value', sa.JSON)
+)
+
+
+def upgrade():
+    op.create_table('deque_item',
+    sa.Column('deque_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('value', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['deque_id'], ['deque_operation.id'], ),
+    sa.PrimaryKeyConstraint('deque_id', 'seq')
+    )
+    with op.batch_alter_table('deque_operation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('head', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('tail', sa.Integer(), nullable=False, server_default='0'))
+
+    # Unpack every pickled list into one row per item
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(deque_operation.c.id, deque_operation.c.deque_data)).fetchall()
+    for deque_id, values in rows:
+        values = values or []
+        if values:
+            bind.execute(deque_item.insert(), [
+                {'deque_id': deque_id, 'seq': seq, 'value': value}
+                for seq, value in enumerate(values)
+            ])
+        bind.execute(
+            deque_operation.update()
+            .where(deque_operation.c.id == deque_id)
+            .values(head=0, tail=len(values))
+        )
+
+    with op.batch_alter_table('deque_operation', schema=None) as batch_op:
+        batch_op.drop_column('deque_data')
+
+
+def downgrade():
+    with op.batch_alter_table('deque_operation', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deque_data', sa.PickleType(), nullable=True))
+
+    # Fold the rows back into one pickled list per deque
+    bind = op.get_bind()
+    deque_ids = [row[0] for row in bind.execute(sa.select(deque_operation.c.id)).fetchall()]
+    for deque_id in deque_ids:
+        values = [row[0] for row in bind.execute(
+            sa.select(deque_item.c.value)
+            .where(deque_item.c.deque_id == deque_id)
+            .order_by(deque_item.c.seq)
+        ).fetchall()]
+        bind.execute(
+            deque_operation.update()
+            .where(deque_operation.c.id == deque_id)
+            .values(deque_data=values)
+        )
+
+    with op.batch_alter_table('deque_operation', schema=None) as batch_op:
+        batch_op.drop_column('tail')
+        batch_op.drop_column('head')
+
+    op.drop_table('deque_item')
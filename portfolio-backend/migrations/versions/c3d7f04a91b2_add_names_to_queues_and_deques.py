@@ -0,0 +1,41 @@
+"""Add names to queues and deques
+
+Revision ID: c3d7f04a91b2
+Revises: b81e5d3a6c90
+Create Date: 2026-10-18 11:26:03.671944
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d7f04a91b2'
+down_revision = 'b81e5d3a6c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    for table_name in ('queue_operation', 'deque_operation'):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('name', sa.String(length=100), nullable=True))
+
+        # The routes only ever used the first row, so it becomes 'default'
+        table = sa.table(table_name, sa.column('id', sa.Integer), sa.column('name', sa.String))
+        ids = [row[0] for row in bind.execute(sa.select(table.c.id).order_by(table.c.id)).fetchall()]
+        for position, row_id in enumerate(ids):
+            name = 'default' if position == 0 else f'legacy-{row_id}'
+            bind.execute(table.update().where(table.c.id == row_id).values(name=name))
+
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.alter_column('name', existing_type=sa.String(length=100), nullable=False)
+            batch_op.create_index(batch_op.f(f'ix_{table_name}_name'), ['name'], unique=True)
+
+
+def downgrade():
+    for table_name in ('deque_operation', 'queue_operation'):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table_name}_name'))
+            batch_op.drop_column('name')
@@ -0,0 +1,35 @@
+"""Add version to train graph
+
+Revision ID: e9b4c27d5f13
+Revises: d5a8e2f6b417
+Create Date: 2026-10-18 15:02:41.318206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c27d5f13'
+down_revision = 'd5a8e2f6b417'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('train_graph', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=True))
+
+    # Nothing wrote this table before, but number any existing rows in id order
+    table = sa.table('train_graph', sa.column('id', sa.Integer), sa.column('version', sa.Integer))
+    op.execute(table.update().values(version=table.c.id))
+
+    with op.batch_alter_table('train_graph', schema=None) as batch_op:
+        batch_op.alter_column('version', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_index(batch_op.f('ix_train_graph_version'), ['version'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('train_graph', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_train_graph_version'))
+        batch_op.drop_column('version')